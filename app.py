@@ -2,12 +2,31 @@ import streamlit as st
 import pandas as pd
 import mysql.connector
 from datetime import datetime
-import csv
 import logging
 import os
-from collections import defaultdict
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit.components.v1 as components
-import time
+
+import async_check
+import bulk_fetch
+import cte_fetch
+import db_pool
+import duplicates
+from db_pool import connect_to_db
+import funds_math
+import funds_store
+import jobs
+import logging_setup
+from progress import make_reporter
+import program_prices
+import query_stats
+from records import Enrollment, StudentFunds
+import result_cache
+import singleflight
+import streaming_check
+import table_search
+import table_view
 
 # Set the page layout to wide - this must be the first Streamlit command
 st.set_page_config(layout="wide")
@@ -34,34 +53,20 @@ FILTER_DISBSTATUS_X = st.sidebar.checkbox(
 )
 st.session_state.FILTER_DISBSTATUS_X = FILTER_DISBSTATUS_X
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,  # Change to DEBUG for more detailed logs
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("student_funds.log"),
-        logging.StreamHandler()
-    ]
+# Add checkbox to bypass the cached funds table on the next run
+FORCE_REFRESH = st.sidebar.checkbox(
+    "Force refresh",
+    value=False,
+    help="When checked, Run Check ignores cached results and re-queries the database"
 )
+if st.sidebar.button("Clear cached results"):
+    result_cache.invalidate()
 
-# ---------------- Database Functions ---------------- #
+# Configure logging: a background writer to a rotating student_funds.log and stderr.
+# Set LOG_LEVEL=DEBUG for the per-student lines (see logging_setup.py).
+logging_setup.configure()
 
-def connect_to_db():
-    """Establish a connection to the MySQL database."""
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'campuscloud-public.mdb0002003.db.skysql.net'),
-            user=os.getenv('DB_USER', 'russell'),
-            password=os.getenv('DB_PASSWORD', 'Ab4W034#72ecqe'),
-            database=os.getenv('DB_NAME', 'mediatechcloud_sdb'),
-            port=int(os.getenv('DB_PORT', 5002))
-        )
-        if connection.is_connected():
-            logging.info("Successfully connected to the database.")
-        return connection
-    except mysql.connector.Error as e:
-        logging.error(f"Error connecting to database: {e}")
-        return None
+# ---------------- Database Functions ---------------- #
 
 def get_current_date():
     """Return the current date in YYYY-MM-DD format."""
@@ -158,14 +163,7 @@ def get_enrollments(db, limit=None):
         """
         cursor.execute(query)
         results = cursor.fetchall()
-        enrollments = [
-            {'student_id': row[0],
-             'start_date': row[1],
-             'program': row[2],
-             'status': row[3],
-             'enrollment_number': row[4]}
-            for row in results
-        ]
+        enrollments = list(map(Enrollment._make, results))
         logging.info(f"Number of most recent enrollments found: {len(enrollments)}")
         return enrollments
     except mysql.connector.Error as e:
@@ -174,41 +172,6 @@ def get_enrollments(db, limit=None):
     finally:
         cursor.close()
 
-def get_program_details(db, program_code):
-    """
-    Get the program details (using COACODE as price per credit) from the programs table.
-    If COACODE is empty or invalid, default to 0.0.
-    """
-    cursor = db.cursor(buffered=True)
-    try:
-        query = '''
-        SELECT COACODE
-        FROM `programs`
-        WHERE `PROGRAMCODE` = %s
-          AND `ACTIVE` = 1;
-        '''
-        cursor.execute(query, (program_code,))
-        result = cursor.fetchone()
-        if result and result[0] is not None:
-            coacode_str = str(result[0]).strip()
-            if coacode_str == '':
-                logging.warning(f"COACODE for Program {program_code} is empty.")
-                return 0.0
-            try:
-                price_per_credit = float(coacode_str)
-                return price_per_credit
-            except ValueError:
-                logging.error(f"Invalid COACODE format for Program {program_code}: '{coacode_str}'. Setting Price per Credit to 0.0.")
-                return 0.0
-        else:
-            logging.warning(f"No active COACODE found for Program {program_code}. Setting Price per Credit to 0.0.")
-            return 0.0
-    except mysql.connector.Error as e:
-        logging.error(f"Error in get_program_details for Program {program_code}: {e}")
-        return 0.0
-    finally:
-        cursor.close()
-
 def check_account_ledger(db, student_id, term_start_date, term_end_date):
     """Check the account ledger for a student and return the tuition amount or 'No Tuition'."""
     cursor = db.cursor(buffered=True)
@@ -311,7 +274,7 @@ def get_latest_enrollment_number(db, student_id):
         if result and result[0] is not None:
             return result[0]
         else:
-            logging.warning(f"No enrollment number found for Student ID {student_id}.")
+            logging.warning("No enrollment number found for Student ID %s.", student_id)
             return None
     except mysql.connector.Error as e:
         logging.error(f"Error in get_latest_enrollment_number for Student ID {student_id}: {e}")
@@ -333,7 +296,7 @@ def get_student_name(db, student_id):
         if result:
             return result[0], result[1]
         else:
-            logging.warning(f"No name found for Student ID {student_id}.")
+            logging.warning("No name found for Student ID %s.", student_id)
             return "", ""
     except mysql.connector.Error as e:
         logging.error(f"Error retrieving name for Student ID {student_id}: {e}")
@@ -341,11 +304,139 @@ def get_student_name(db, student_id):
     finally:
         cursor.close()
 
+def fetch_student_funds(db, enrollment, term_start_date, term_end_date, prices):
+    """Fetch the raw funds inputs for one enrollment with the per-student queries and the program price index."""
+    student_id = enrollment.student_id
+    return StudentFunds(
+        check_account_ledger(db, student_id, term_start_date, term_end_date),
+        get_term_scheduled_funds(db, student_id, term_start_date, term_end_date),
+        get_total_scheduled_funds(db, student_id),
+        get_total_credits(db, student_id, term_start_date, term_end_date),
+        get_total_enrollment_credits(db, student_id),
+        prices.price(enrollment.program),
+        *get_student_name(db, student_id)
+    )
+
+def fetch_student_funds_parallel(enrollments, term_start_date, term_end_date, workers, prices):
+    """
+    Yield fetch_student_funds results in enrollment order, spreading the students
+    across a thread pool in which each worker holds its own pooled connection.
+    """
+    worker_state = threading.local()
+    worker_connections = []
+    connections_lock = threading.Lock()
+    # Worker threads record their queries into the run that started them
+    stats = query_stats.current()
+
+    def fetch(enrollment):
+        db = getattr(worker_state, 'db', None)
+        if db is None:
+            db = query_stats.instrument(connect_to_db(), stats)
+            if db is None:
+                raise RuntimeError("Could not get a database connection for a worker thread.")
+            worker_state.db = db
+            with connections_lock:
+                worker_connections.append(db)
+        return fetch_student_funds(db, enrollment, term_start_date, term_end_date, prices)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="funds-check") as executor:
+            yield from executor.map(fetch, enrollments)
+    finally:
+        for db in worker_connections:
+            db.close()
+
 # ---------------- Main Check Function ---------------- #
 
-def run_check():
-    """Run all the checks, write data to CSV files, and log the results."""
-    db = connect_to_db()
+# "bulk" loads each aggregate for the whole term with one grouped query per table;
+# "per_student" issues the individual helper queries for every enrollment;
+# "parallel" runs the per-student queries on a pool of worker threads;
+# "async" runs them as coroutines over a few asyncio connections (see async_check.py);
+# "cte" loads the enrollments and every aggregate in one statement (see cte_fetch.py);
+# "streaming" pipes ordered enrollment batches straight into the output files (see streaming_check.py).
+CHECK_MODES = ("bulk", "per_student", "parallel", "async", "cte", "streaming")
+
+# Default number of worker threads for the "parallel" mode.
+CHECK_WORKERS = int(os.getenv('CHECK_WORKERS', 4))
+
+def compute_funds_table(db, mode, term_code, term_start_date, term_end_date, reporter, workers=None):
+    """Fetch the raw inputs for every current enrollment and return the computed funds table."""
+    if mode != "cte":
+        enrollments = get_enrollments(db)
+        enrollments = sorted(enrollments, key=lambda x: x.student_id)
+        # Every mode but "cte" prices students from one parsed copy of the programs table
+        prices = program_prices.load_price_index(db)
+
+    if mode == "cte":
+        # The one statement returns the enrollments along with their funds and COACODEs
+        enrollments, student_funds, prices = cte_fetch.load_term_funds(
+            db, term_start_date, term_end_date, FILTER_DISBSTATUS_X
+        )
+    elif mode == "bulk":
+        term_data = bulk_fetch.load_term_data(db, term_start_date, term_end_date, FILTER_DISBSTATUS_X)
+        student_funds = (bulk_fetch.lookup_student_funds(term_data, enrollment, prices) for enrollment in enrollments)
+    elif mode == "parallel":
+        # This run already holds one pooled connection, so leave it out of the worker count.
+        worker_count = max(1, min(workers or CHECK_WORKERS, db_pool.POOL_SIZE - 1))
+        logging.info(f"Fetching student funds with {worker_count} worker threads.")
+        student_funds = fetch_student_funds_parallel(enrollments, term_start_date, term_end_date, worker_count, prices)
+    elif mode == "async":
+        student_funds = async_check.fetch_student_funds_async(
+            enrollments, term_start_date, term_end_date, FILTER_DISBSTATUS_X, prices
+        )
+    else:
+        student_funds = (fetch_student_funds(db, enrollment, term_start_date, term_end_date, prices) for enrollment in enrollments)
+
+    processed_count = 0
+    total_records = len(enrollments)
+    reporter.start(total_records)
+
+    # Fetch stage: gather the raw inputs for every enrollment
+    raw_rows = []
+    for funds, enrollment in zip(student_funds, enrollments):
+        logging.debug("Processing Student ID: %s, Enrollment Start Date: %s, Program: %s, Status: %s",
+                      *enrollment[:4])
+
+        # The row carries the link as plain text (converted to clickable HTML later)
+        raw_rows.append(funds_math.input_row(enrollment, funds, term_code))
+
+        processed_count += 1
+        reporter.update(processed_count)
+
+    reporter.finish()
+    logging.info("Fetched funds for %d enrollments.", processed_count)
+    prices.log_summary()
+
+    # Computation stage: derive prices and remaining need for all rows at once
+    return funds_math.compute_funds(pd.DataFrame(raw_rows, columns=funds_math.INPUT_COLUMNS))
+
+def run_check(mode="bulk", progress=None, workers=None, force_refresh=False):
+    """
+    Run all the checks, write data to CSV files, log the results and return the funds table
+    (the published manifest in "streaming" mode, which never holds the whole table).
+    Concurrent calls for the same day, filter setting and options share one run (see singleflight.py).
+    `progress` is an optional progress.ProgressReporter; by default a Streamlit
+    reporter is used inside the app and a silent one elsewhere (e.g. local_run.py).
+    `workers` sets the thread count for the "parallel" mode (default CHECK_WORKERS).
+    A table computed earlier for the same term, filter setting and day is reused
+    from result_cache unless `force_refresh` is set; "streaming" never reads the
+    cache and invalidates it once its outputs are published.
+    """
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    key = (current_date, FILTER_DISBSTATUS_X, mode, force_refresh)
+    return singleflight.group("app.run_check").do(key, _run_check, mode, progress, workers, force_refresh)
+
+def _run_check(mode, progress, workers, force_refresh):
+    """Body of run_check, run once per set of concurrent callers."""
+    if mode not in CHECK_MODES:
+        raise ValueError(f"Unknown check mode '{mode}'. Expected one of {CHECK_MODES}.")
+    # Every query of the run is timed; the summary is logged and shown in the UI (see query_stats.py)
+    with query_stats.collect("app.run_check"):
+        return _check_funds(mode, progress, workers, force_refresh)
+
+def _check_funds(mode, progress, workers, force_refresh):
+    """Run the check on an instrumented connection and return the funds table."""
+    db = query_stats.instrument(connect_to_db())
     if db:
         try:
             current_date = get_current_date()
@@ -356,119 +447,109 @@ def run_check():
 
             logging.info(f"Term Start Date: {term_start_date}, Term End Date: {term_end_date}")
 
-            enrollments = get_enrollments(db)
-            enrollments = sorted(enrollments, key=lambda x: x['student_id'])
-
-            # CSV file setup for main data
             csv_file = "student_funds.csv"
-            with open(csv_file, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                header = [
-                    "Student ID",
-                    "First Name",
-                    "Last Name",
-                    "Program",
-                    "Start Date",
-                    "Term Code",
-                    "Status",
-                    "Tuition",
-                    "Term Expected",
-                    "Total Expected",
-                    "Credits",
-                    "Price per Credit",
-                    "Semester Price",
-                    "Overall Enrollment Credits",
-                    "Overall Price",
-                    "Remaining Need",
-                    "Link"
-                ]
-                writer.writerow(header)
-
-                processed_count = 0
-                total_records = len(enrollments)
-                progress_text_placeholder = st.empty()
-                my_bar = st.progress(0)
-
-                for enrollment in enrollments:
-                    student_id = enrollment['student_id']
-                    enrollment_start_date = enrollment['start_date']
-                    program_code = enrollment['program']
-                    status = enrollment['status']
-
-                    logging.info(f"Processing Student ID: {student_id}, Enrollment Start Date: {enrollment_start_date}, Program: {program_code}, Status: {status}")
-
-                    tuition_amount = check_account_ledger(db, student_id, term_start_date, term_end_date)
-                    term_scheduled_funds = get_term_scheduled_funds(db, student_id, term_start_date, term_end_date)
-                    total_scheduled_funds = get_total_scheduled_funds(db, student_id)
-                    total_credits = get_total_credits(db, student_id, term_start_date, term_end_date)
-                    total_enrollment_credits = get_total_enrollment_credits(db, student_id)
-                    price_per_credit = get_program_details(db, program_code)
-                    semester_price = float(total_credits) * price_per_credit if price_per_credit else 0.0
-                    overall_price = float(total_enrollment_credits) * price_per_credit if price_per_credit else 0.0
-                    remaining_need = overall_price - total_scheduled_funds
-
-                    # Create the link as plain text (will be converted to clickable HTML later)
-                    link = f"https://mediatechcloud.com/index.php?name={student_id}"
-
-                    first_name, last_name = get_student_name(db, student_id)
-                    row_data = [
-                        student_id,
-                        first_name,
-                        last_name,
-                        program_code,
-                        enrollment_start_date,
-                        term_code,
-                        status,
-                        tuition_amount,
-                        term_scheduled_funds,
-                        total_scheduled_funds,
-                        total_credits,
-                        price_per_credit,
-                        semester_price,
-                        total_enrollment_credits,
-                        overall_price,
-                        remaining_need,
-                        link
-                    ]
-                    writer.writerow(row_data)
-
-                    processed_count += 1
-                    percent_complete = int((processed_count / total_records) * 100)
-                    progress_text = f"Processing record {processed_count} of {total_records}. Please wait."
-                    progress_text_placeholder.text(progress_text)
-                    my_bar.progress(percent_complete)
-                    time.sleep(0.1)  # Add a short delay to allow the UI to update
-
-                logging.info(f"CSV file '{csv_file}' created successfully with {processed_count} records.")
+            if mode == "streaming":
+                # Every student is recomputed and written batch by batch; result_cache is never read
+                manifest = streaming_check.run_streaming_check(
+                    db, term_code, term_start_date, term_end_date, FILTER_DISBSTATUS_X,
+                    progress if progress is not None else make_reporter()
+                )
+                if manifest is not None:
+                    # Cached tables are older than the outputs just published
+                    result_cache.invalidate(term_code)
+                return manifest
+
+            cache_key = result_cache.make_key(term_code, FILTER_DISBSTATUS_X, current_date)
+            funds_df = None if force_refresh else result_cache.get(cache_key)
+            if funds_df is not None:
+                logging.info(f"Using cached funds table for term {term_code} ({len(funds_df)} records).")
+            else:
+                reporter = progress if progress is not None else make_reporter()
+                funds_df = compute_funds_table(db, mode, term_code, term_start_date, term_end_date, reporter, workers)
+                result_cache.put(cache_key, funds_df)
+
+            if funds_store.is_published(funds_df, csv_file=csv_file, term_code=term_code):
+                # Rewriting would publish a new version of the same table and empty the version-keyed caches
+                logging.info(f"Published result {funds_store.result_version()} is unchanged; not rewriting it.")
+                return funds_df
+
+            # Store the typed result and export the CSV
+            funds_store.save_result(funds_df, csv_file=csv_file, term_code=term_code)
 
             # Identify duplicate records and write them to a separate CSV file
-            student_id_counts = defaultdict(list)
-            duplicate_records = []
-            with open(csv_file, mode='r') as file:
-                reader = csv.reader(file)
-                header = next(reader)  # Skip header
-                for row in reader:
-                    student_id = row[0]
-                    student_id_counts[student_id].append(row)
-                    if len(student_id_counts[student_id]) > 1:
-                        duplicate_records.extend(student_id_counts[student_id])
-
-            with open("duplicate_student_funds.csv", mode='w', newline='') as dup_file:
-                dup_writer = csv.writer(dup_file)
-                dup_writer.writerow(header)  # Write header
-                for record in duplicate_records:
-                    dup_writer.writerow(record)
-
-            logging.info(f"Duplicate CSV file 'duplicate_student_funds.csv' created successfully with {len(duplicate_records)} records.")
+            duplicate_df = duplicates.find_duplicates(funds_df)
+            funds_store.export_csv(duplicate_df, "duplicate_student_funds.csv")
+
+            return funds_df
 
         except Exception as e:
             logging.error(f"An error occurred: {e}")
         finally:
             db.close()
-            logging.info("Database connection closed.")
+            logging.info("Database connection returned to the pool.")
 
 # ---------------- Streamlit Main Application ---------------- #
 
+def run_check_job(reporter, force_refresh):
+    """Background job body: run the check and return the CSV path, or None if it failed."""
+    if run_check(progress=reporter, force_refresh=force_refresh) is None:
+        return None
+    return funds_store.CSV_FILE
+
+@st.fragment(run_every=2)
+def show_check_job():
+    """Poll the submitted check job, showing its progress, and rerun the page once it ends."""
+    job_id = st.session_state.get('check_job')
+    if not job_id:
+        return
+    job = jobs.get_job(job_id)
+    if job is None:
+        del st.session_state.check_job
+        return
+    if job['status'] in jobs.ACTIVE_STATUSES:
+        if job['total']:
+            st.text(f"Processing record {job['processed']} of {job['total']}. Please wait.")
+            st.progress(int(job['processed'] / job['total'] * 100))
+        else:
+            st.text("Check started. Please wait.")
+        return
+    del st.session_state.check_job
+    st.session_state.finished_check_job = job
+    st.rerun()
+
+@st.cache_data(max_entries=2)
+def load_funds_table(version):
+    """Load the stored funds table; `version` keys the cache so a new result is picked up."""
+    df = funds_store.load_result()
+    if version is None or df is None:
+        raise FileNotFoundError(funds_store.RESULT_FILE)
+    return df
+
+@st.cache_resource(max_entries=2)
+def load_search_index(version):
+    """Build the search index once per stored result; it is shared read-only across reruns."""
+    return table_search.build_search_index(load_funds_table(version))
+
+@st.cache_data(max_entries=32)
+def count_matching_rows(version, search_value):
+    """Return how many stored rows match the search box."""
+    if not search_value:
+        return len(load_funds_table(version))
+    return int(table_search.search_mask(load_search_index(version), search_value).sum())
+
+def render_funds_table(version, search_value, table_mode, sort_by=None, descending=False, page_size=None, page_number=1):
+    """Filter, sort and page the stored table and return its DataTables HTML."""
+    df = load_funds_table(version)
+    if search_value:
+        df = df[table_search.search_mask(load_search_index(version), search_value)]
+
+    if table_mode == "Paginated":
+        df = table_view.sort_table(df, sort_by, ascending=not descending)
+        return table_view.render_table_html(table_view.get_page(df, page_number, page_size), client_sorting=False)
+
+    # Display the whole DataFrame as an HTML table enhanced with DataTables for column sorting
+    return table_view.render_table_html(df)
+
 def main():
     st.title("Student Funds Check")
 
@@ -476,94 +557,73 @@ def main():
     page = st.sidebar.selectbox("Choose a page", ["Run Check", "Download CSV"])
 
     if page == "Run Check":
+        table_mode = st.sidebar.radio(
+            "Table mode",
+            table_view.TABLE_MODES,
+            help="Paginated sorts and pages on the server and only renders the visible rows"
+        )
+
         st.header("Run Check")
         if st.button("Run Check"):
-            run_check()
+            # Runs in the background; an identical check already in flight is joined instead.
+            # A forced refresh never joins a non-forced run, which may serve the cached table.
+            force_refresh = FORCE_REFRESH
+            st.session_state.check_job = jobs.submit(
+                "funds_check",
+                (get_current_date(), FILTER_DISBSTATUS_X, force_refresh),
+                lambda reporter: run_check_job(reporter, force_refresh)
+            )
+        show_check_job()
+
+        finished_job = st.session_state.pop('finished_check_job', None)
+        if finished_job and finished_job['status'] == jobs.DONE:
             st.success("Check completed!")
+        elif finished_job:
+            st.error(f"Check failed: {finished_job['error']}")
+
+        last_run = query_stats.last_run("app.run_check")
+        if last_run is not None:
+            with st.expander(f"Query timings for the last run ({last_run.elapsed:.1f}s)"):
+                st.dataframe(last_run.summary(), use_container_width=True)
 
-        # Read the CSV file and display it using Streamlit's built-in methods
+        # Display the stored result; the rendered table is cached until the result or the view changes
         try:
-            df = pd.read_csv("student_funds.csv")
-            
-            # Add a search box to filter table content
-            search_value = st.text_input("Search Table", "")
-            if search_value:
-                df = df[df.apply(lambda row: row.astype(str).str.contains(search_value, case=False, na=False).any(), axis=1)]
-            
-            # Convert the 'Link' column to clickable HTML links (if not already converted)
-            if 'Link' in df.columns:
-                df['Link'] = df['Link'].apply(lambda x: f'<a href="{x}" target="_blank">Click here</a>' if pd.notnull(x) else '')
+            version = funds_store.result_version()
+            if version is None:
+                raise FileNotFoundError(funds_store.RESULT_FILE)
 
-            # Display the DataFrame as an HTML table enhanced with DataTables for column sorting
-            html_table = df.to_html(escape=False, index=False, table_id="myTable", classes="display")
-            
-            html_string = f"""
-            <html>
-              <head>
-                <link rel="stylesheet" type="text/css" href="https://cdn.datatables.net/1.13.4/css/jquery.dataTables.min.css"/>
-                <script src="https://code.jquery.com/jquery-3.5.1.min.js"></script>
-                <script src="https://cdn.datatables.net/1.13.4/js/jquery.dataTables.min.js"></script>
-                <style>
-                 #myTable {{
-                        width: 100% !important;
-                        margin: 0 !important;
-                    }}
-                    .dataTables_wrapper {{
-                        position: relative;
-                    }}
-                    .dataTables_scrollHead {{
-                        position: sticky !important;
-                        top: 0;
-                        z-index: 1;
-                        background: white;
-                    }}
-                    .dataTables_scrollBody {{
-                        position: relative;
-                    }}
-                    th, td {{
-                        white-space: nowrap;
-                        padding: 8px !important;
-                    }}                </style>
-              </head>
-              <body>
-                {html_table}
-               <script>
-                  $(document).ready(function() {{
-                      var table = $('#myTable').DataTable({{
-                        "searching": false,
-                        "paging": false,
-                        "scrollY": "550px",
-                        "scrollX": true,
-                        "autoWidth": true,
-                        "scrollCollapse": true,
-                        "fixedHeader": true,
-                        "columnDefs": [{{
-                            "targets": "_all",
-                            "className": "dt-head-left"  // Align header text left
-                        }}]
-                      }});
-                      
-                      // Initial column adjustment
-                      table.columns.adjust().draw();
-                      
-                      // Handle window resize
-                      $(window).on('resize', function() {{
-                          table.columns.adjust();
-                      }});
-                      
-                      // Handle container resize (for Streamlit)
-                      new ResizeObserver(() => {{
-                          table.columns.adjust();
-                      }}).observe(document.querySelector('.dataTables_wrapper'));
-                  }});
-                </script>
-              </body>
-            </html>
-            """
+            # Add a search box to filter table content
+            search_value = st.text_input(
+                "Search Table",
+                "",
+                help="Words must all match somewhere in the row. Use column:value (e.g. program:ABC) to search one column."
+            )
+
+            if table_mode == "Paginated":
+                # Sort and slice on the server so only the visible page is sent to the browser
+                sort_col, order_col, size_col, page_col = st.columns([3, 2, 2, 2])
+                sort_by = sort_col.selectbox("Sort by", ["(none)"] + funds_math.FUNDS_COLUMNS)
+                descending = order_col.selectbox("Order", ["Ascending", "Descending"]) == "Descending"
+                page_size = size_col.selectbox("Rows per page", table_view.PAGE_SIZES, index=1)
+                total_rows = count_matching_rows(version, search_value)
+                total_pages = table_view.page_count(total_rows, page_size)
+                page_number = page_col.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+
+                first_row = min((page_number - 1) * page_size + 1, total_rows)
+                last_row = min(page_number * page_size, total_rows)
+                st.caption(f"Showing rows {first_row}-{last_row} of {total_rows}")
+                view = (table_mode, sort_by if sort_by != "(none)" else None, descending, page_size, page_number)
+            else:
+                view = (table_mode,)
+
+            html_string = table_view.cached_render(
+                (version, search_value) + view,
+                lambda: render_funds_table(version, search_value, *view)
+            )
 
             components.html(html_string, height=600)
             
-        except (FileNotFoundError, pd.errors.EmptyDataError):
+        except FileNotFoundError:
             st.error("No data found. Please run the check first.")
 
     elif page == "Download CSV":
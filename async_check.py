@@ -0,0 +1,269 @@
+"""
+Asyncio variant of the per-student data access for the Student Funds Check.
+
+The per-student check spends nearly all its time waiting on round trips to the
+remote database. Here the same queries as app.py's helpers run as coroutines on
+mysql.connector's asyncio API: a small set of connections (ASYNC_CONNECTIONS)
+is shared through a queue, so one query is in flight on each connection at all
+times, and a semaphore (ASYNC_CONCURRENCY) bounds how many students are being
+fetched at once. app.compute_funds_table uses it for the "async" mode.
+
+Each helper returns the same value and default as its app.py counterpart.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+
+import mysql.connector
+from mysql.connector import aio
+
+import db_pool
+import query_stats
+from records import StudentFunds
+
+# Connections opened for an async run, and students fetched concurrently.
+ASYNC_CONNECTIONS = int(os.getenv('ASYNC_CONNECTIONS', 4))
+ASYNC_CONCURRENCY = int(os.getenv('ASYNC_CONCURRENCY', 64))
+
+# ---------------- Connections ---------------- #
+
+async def open_connection():
+    """Open one asyncio connection with the shared database settings, instrumented for the current run."""
+    factory = db_pool.get_async_connection_factory()
+    if factory is not None:
+        return query_stats.instrument_async(await factory())
+    return query_stats.instrument_async(await aio.connect(**db_pool.DB_CONFIG))
+
+class AsyncConnectionPool:
+    """A fixed set of asyncio connections handed out through a queue."""
+
+    def __init__(self, size):
+        self.size = size
+        self._connections = []
+        self._idle = asyncio.Queue()
+
+    async def open(self):
+        """Open all connections up front."""
+        opened = await asyncio.gather(*(open_connection() for _ in range(self.size)), return_exceptions=True)
+        self._connections = [cnx for cnx in opened if not isinstance(cnx, BaseException)]
+        failures = [error for error in opened if isinstance(error, BaseException)]
+        if failures:
+            await self.close()
+            raise failures[0]
+        for cnx in self._connections:
+            self._idle.put_nowait(cnx)
+        logging.info(f"Opened {self.size} async database connections.")
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        """Borrow an idle connection, waiting for one if all are busy."""
+        cnx = await self._idle.get()
+        try:
+            yield cnx
+        finally:
+            self._idle.put_nowait(cnx)
+
+    async def close(self):
+        """Close every connection."""
+        for cnx in self._connections:
+            try:
+                await cnx.close()
+            except mysql.connector.Error as e:
+                logging.error(f"Error closing async connection: {e}")
+        self._connections = []
+
+async def _fetch_one(pool, query, params):
+    """Run a query on a borrowed connection and return its first row."""
+    async with pool.connection() as cnx:
+        cursor = await cnx.cursor(buffered=True)
+        try:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+        finally:
+            await cursor.close()
+
+# ---------------- Database Functions ---------------- #
+
+async def get_total_credits(pool, student_id, start_date, end_date):
+    """Fetch the total credits for a student within the specified term dates."""
+    try:
+        query = '''
+        SELECT SUM(CREDIT) as total_credits
+        FROM `mediatechcloud_sdb`.`transcript`
+        WHERE `ENDDATE` >= %s
+          AND `STARTDATE` <= %s
+          AND `ID` = %s;
+        '''
+        result = await _fetch_one(pool, query, (start_date, end_date, student_id))
+        if result and result[0] is not None:
+            return float(result[0])
+        return 0.0
+    except mysql.connector.Error as e:
+        logging.error(f"Error in get_total_credits for Student ID {student_id}: {e}")
+        return 0.0
+
+async def get_total_enrollment_credits(pool, student_id):
+    """Fetch the total enrollment credits for a student from the enrollments table."""
+    try:
+        query = '''
+        SELECT CREDIT as total_enrollment_credits
+        FROM `enrollments`
+        WHERE `ID` = %s
+          AND `STATUS` IN ("C", "P", "W")
+          AND `TYPE` = 'E'
+        LIMIT 1;
+        '''
+        result = await _fetch_one(pool, query, (student_id,))
+        if result and result[0] is not None:
+            return float(result[0])
+        return 0.0
+    except mysql.connector.Error as e:
+        logging.error(f"Error in get_total_enrollment_credits for Student ID {student_id}: {e}")
+        return 0.0
+
+async def check_account_ledger(pool, student_id, term_start_date, term_end_date):
+    """Check the account ledger for a student and return the tuition amount or 'No Tuition'."""
+    try:
+        query = '''
+        SELECT SUM(TRANSACTIONAMOUNT) as tuition_amount
+        FROM `accountledger`
+        WHERE `TRANSACTIONCODE` = "Tuition"
+          AND `TRANSACTIONDATE` <= %s
+          AND `TRANSACTIONDATE` >= %s
+          AND `ID` = %s;
+        '''
+        result = await _fetch_one(pool, query, (term_end_date, term_start_date, student_id))
+        if result and result[0] is not None:
+            return float(result[0])
+        return "No Tuition"
+    except mysql.connector.Error as e:
+        logging.error(f"Error in check_account_ledger for Student ID {student_id}: {e}")
+        return "No Tuition"
+
+async def get_term_scheduled_funds(pool, student_id, term_start_date, term_end_date, filter_disbstatus_x):
+    """Check scheduled funds for the current term for a student."""
+    try:
+        disbstatus_clause = 'AND `DISBSTATUS` NOT IN ("X")' if filter_disbstatus_x else ''
+        query = f'''
+        SELECT SUM(NETAMOUNTSCHED) as term_scheduled_funds
+        FROM `disbursements`
+        WHERE `ID` = %s
+          AND `DATESCHED` >= %s
+          AND `DATESCHED` <= %s
+          {disbstatus_clause};
+        '''
+        result = await _fetch_one(pool, query, (student_id, term_start_date, term_end_date))
+        if result and result[0] is not None:
+            return float(result[0])
+        return 0.0
+    except mysql.connector.Error as e:
+        logging.error(f"Error in get_term_scheduled_funds for Student ID {student_id}: {e}")
+        return 0.0
+
+async def get_latest_enrollment_number(pool, student_id):
+    """Return the most recent (largest) enrollment number for the given student."""
+    try:
+        query = "SELECT MAX(ENROLLMENTNUMBER) FROM enrollments WHERE ID = %s;"
+        result = await _fetch_one(pool, query, (student_id,))
+        if result and result[0] is not None:
+            return result[0]
+        logging.warning("No enrollment number found for Student ID %s.", student_id)
+        return None
+    except mysql.connector.Error as e:
+        logging.error(f"Error in get_latest_enrollment_number for Student ID {student_id}: {e}")
+        return None
+
+async def get_total_scheduled_funds(pool, student_id, filter_disbstatus_x):
+    """Check total scheduled funds for the most recent enrollment (by enrollment number) for a student."""
+    enrollment_number = await get_latest_enrollment_number(pool, student_id)
+    if enrollment_number is None:
+        return 0.0
+    try:
+        disbstatus_clause = 'AND DISBSTATUS NOT IN ("X")' if filter_disbstatus_x else ''
+        query = f'''
+        SELECT SUM(NETAMOUNTSCHED) as total_scheduled_funds
+        FROM disbursements
+        WHERE ID = %s
+          AND ENROLLMENTNUMBER = %s
+          {disbstatus_clause};
+        '''
+        result = await _fetch_one(pool, query, (student_id, enrollment_number))
+        if result and result[0] is not None:
+            return float(result[0])
+        return 0.0
+    except mysql.connector.Error as e:
+        logging.error(f"Error in get_total_scheduled_funds for Student ID {student_id}: {e}")
+        return 0.0
+
+async def get_student_name(pool, student_id):
+    """Return the first name and last name for the given student ID."""
+    try:
+        query = '''
+        SELECT FNAME, LNAME
+        FROM students
+        WHERE ID = %s;
+        '''
+        result = await _fetch_one(pool, query, (student_id,))
+        if result:
+            return result[0], result[1]
+        logging.warning("No name found for Student ID %s.", student_id)
+        return "", ""
+    except mysql.connector.Error as e:
+        logging.error(f"Error retrieving name for Student ID {student_id}: {e}")
+        return "", ""
+
+# ---------------- Fan-out ---------------- #
+
+async def fetch_student_funds(pool, enrollment, term_start_date, term_end_date, filter_disbstatus_x, prices):
+    """Fetch the raw funds inputs for one enrollment, running its queries concurrently."""
+    student_id = enrollment.student_id
+    (
+        tuition_amount,
+        term_scheduled_funds,
+        total_scheduled_funds,
+        total_credits,
+        total_enrollment_credits,
+        (first_name, last_name),
+    ) = await asyncio.gather(
+        check_account_ledger(pool, student_id, term_start_date, term_end_date),
+        get_term_scheduled_funds(pool, student_id, term_start_date, term_end_date, filter_disbstatus_x),
+        get_total_scheduled_funds(pool, student_id, filter_disbstatus_x),
+        get_total_credits(pool, student_id, term_start_date, term_end_date),
+        get_total_enrollment_credits(pool, student_id),
+        get_student_name(pool, student_id),
+    )
+    return StudentFunds(
+        tuition_amount,
+        term_scheduled_funds,
+        total_scheduled_funds,
+        total_credits,
+        total_enrollment_credits,
+        prices.price(enrollment.program),
+        first_name,
+        last_name,
+    )
+
+async def fetch_all_student_funds(enrollments, term_start_date, term_end_date, filter_disbstatus_x, prices,
+                                  connections=None, concurrency=None):
+    """Return fetch_student_funds results for every enrollment, in enrollment order."""
+    pool = AsyncConnectionPool(connections or ASYNC_CONNECTIONS)
+    semaphore = asyncio.Semaphore(concurrency or ASYNC_CONCURRENCY)
+
+    async def bounded(enrollment):
+        async with semaphore:
+            return await fetch_student_funds(pool, enrollment, term_start_date, term_end_date, filter_disbstatus_x, prices)
+
+    try:
+        await pool.open()
+        return await asyncio.gather(*(bounded(enrollment) for enrollment in enrollments))
+    finally:
+        await pool.close()
+
+def fetch_student_funds_async(enrollments, term_start_date, term_end_date, filter_disbstatus_x, prices,
+                              connections=None, concurrency=None):
+    """Synchronous entry point: run the async fan-out on a fresh event loop and return the results."""
+    return asyncio.run(fetch_all_student_funds(
+        enrollments, term_start_date, term_end_date, filter_disbstatus_x, prices, connections, concurrency
+    ))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end check runs against a synthetic local database.
+
+Builds one SQLite stand-in per scale with benchmarks/synthetic_db.py (same seed,
+same data every time), points db_pool at it with set_connection_factory and
+runs app.run_check in each mode, susans_check.run_check and
+csv_download.run_csv_check. Each run happens in a fresh subprocess, so imports,
+caches and peak memory do not leak between runs. Reported per run: wall time,
+statements executed, output rows, rows per second and the child's peak RSS.
+
+SQLite is in-process, so network round trips cost nothing here; the numbers
+compare the Python side and the query count of each path, not the remote server.
+
+Usage:
+    python benchmarks/check_benchmark.py --students 1000 10000
+    python benchmarks/check_benchmark.py --students 100000 --checks bulk cte csv --output results.json
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic_db
+
+APP_MODES = ("bulk", "per_student", "parallel", "async", "cte", "streaming")
+CHECKS = APP_MODES + ("susans", "csv")
+
+def count_rows(csv_file):
+    """Return the number of data rows in a CSV file."""
+    with open(csv_file, newline='') as file:
+        return sum(1 for _ in csv.reader(file)) - 1
+
+def run_one(check, db_path):
+    """Run one check in this process and return its measurements."""
+    import db_pool
+    db_pool.set_connection_factory(
+        lambda: synthetic_db.connect(db_path),
+        lambda: synthetic_db.connect_async(db_path),
+    )
+    if check in APP_MODES:
+        import app
+        run = lambda: app.run_check(mode=check, force_refresh=True)
+        output = "student_funds.csv"
+    elif check == "susans":
+        import susans_check
+        run = susans_check.run_check
+        output = "student_funds.csv"
+    else:
+        import csv_download
+        from progress import ProgressReporter
+        csv_download.CSV_FILE = output = os.path.abspath("csv_check_student_funds.csv")
+        run = lambda: csv_download.run_csv_check(progress=ProgressReporter())
+    # Keep the checks' logging out of the timing; errors still reach stderr.
+    logging.getLogger().setLevel(logging.ERROR)
+
+    synthetic_db.QUERY_COUNTER.reset()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "queries": synthetic_db.QUERY_COUNTER.count,
+        "rows": count_rows(output),
+        # ru_maxrss is in KiB on Linux (bytes on macOS).
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def run_in_subprocess(check, db_path, workdir):
+    """Run one check in a fresh interpreter inside `workdir` and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-one", check, "--db", db_path],
+        cwd=workdir, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{check} failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+def git_revision():
+    """Return the repository's HEAD commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000],
+                        help="database sizes to run, in students (e.g. 1000 10000 100000)")
+    parser.add_argument("--checks", nargs="+", choices=CHECKS, default=list(CHECKS),
+                        help="checks to run: app.run_check modes, 'susans' and 'csv'")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the synthetic data")
+    parser.add_argument("--workdir", help="directory for databases and outputs (default: a temporary one)")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--run-one", choices=CHECKS, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(args.run_one, args.db)))
+        return
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="check_benchmark_")
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    print(f"{'students':>9} {'check':<12}{'seconds':>10}{'queries':>10}{'rows':>9}{'rows/s':>11}{'peak MiB':>10}")
+    for students in args.students:
+        db_path = os.path.join(workdir, f"synthetic_{students}_{args.seed}.sqlite3")
+        if not os.path.exists(db_path):
+            synthetic_db.populate(db_path, students=students, seed=args.seed)
+        for check in args.checks:
+            run_dir = os.path.join(workdir, f"{check}_{students}")
+            os.makedirs(run_dir, exist_ok=True)
+            measured = run_in_subprocess(check, db_path, run_dir)
+            rows_per_second = measured["rows"] / measured["seconds"] if measured["seconds"] else 0.0
+            results.append({"students": students, "check": check, "rows_per_second": rows_per_second, **measured})
+            print(f"{students:>9} {check:<12}{measured['seconds']:>10.3f}{measured['queries']:>10}"
+                  f"{measured['rows']:>9}{rows_per_second:>11.0f}{measured['peak_rss_kib'] / 1024:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"revision": git_revision(), "seed": args.seed, "results": results}, file, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
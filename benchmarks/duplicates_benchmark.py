@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: duplicate detection on a synthetic funds table.
+
+Compares the old re-read-and-extend loop from run_check against the streaming
+duplicates.DuplicateWriter and the vectorized duplicates.find_duplicates. Rows
+are sorted by student ID like run_check output; a share of the IDs repeat two
+to four times. All output goes to os.devnull.
+
+Usage:
+    python benchmarks/duplicates_benchmark.py --rows 1000000
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duplicates import DuplicateWriter, find_duplicates
+
+HEADER = ["Student ID", "Program", "Tuition", "Remaining Need"]
+
+def make_rows(count, duplicate_share, seed):
+    """Build `count` rows sorted by ID, with `duplicate_share` of the IDs repeated."""
+    rng = random.Random(seed)
+    rows = []
+    student_id = 100000
+    while len(rows) < count:
+        repeats = rng.randint(2, 4) if rng.random() < duplicate_share else 1
+        for _ in range(min(repeats, count - len(rows))):
+            rows.append([str(student_id), "P1", "1500.0", "250.0"])
+        student_id += 1
+    return rows
+
+def run_legacy(rows):
+    """The old algorithm: every new sighting re-extends the whole list for that ID."""
+    student_id_counts = defaultdict(list)
+    duplicate_records = []
+    for row in rows:
+        student_id = row[0]
+        student_id_counts[student_id].append(row)
+        if len(student_id_counts[student_id]) > 1:
+            duplicate_records.extend(student_id_counts[student_id])
+    with open(os.devnull, mode='w', newline='') as dup_file:
+        writer = csv.writer(dup_file)
+        writer.writerow(HEADER)
+        writer.writerows(duplicate_records)
+    return len(duplicate_records)
+
+def run_streaming(rows):
+    """DuplicateWriter fed one row at a time, as during the main write."""
+    with open(os.devnull, mode='w', newline='') as dup_file:
+        duplicate_writer = DuplicateWriter(dup_file, HEADER)
+        for row in rows:
+            duplicate_writer.add(row)
+    return duplicate_writer.count
+
+def run_vectorized(frame):
+    """find_duplicates on the in-memory DataFrame."""
+    return len(find_duplicates(frame))
+
+def timed(function, *args):
+    start = time.perf_counter()
+    emitted = function(*args)
+    return time.perf_counter() - start, emitted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--duplicate-share", type=float, default=0.05,
+                        help="fraction of student IDs that repeat")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.duplicate_share, args.seed)
+    frame = pd.DataFrame(rows, columns=HEADER)
+
+    print(f"{'method':<12}{'rows in':>12}{'rows out':>12}{'seconds':>10}")
+    for name, function, data in (
+        ("legacy", run_legacy, rows),
+        ("streaming", run_streaming, rows),
+        ("vectorized", run_vectorized, frame),
+    ):
+        seconds, emitted = timed(function, data)
+        print(f"{name:<12}{len(rows):>12}{emitted:>12}{seconds:>10.3f}")
+
+if __name__ == '__main__':
+    main()
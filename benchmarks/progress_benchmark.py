@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-record progress loop before and after the throttled reporter.
+
+"Before" reproduces the old run_check loop: one progress update per record
+followed by time.sleep(0.1). "After" uses progress.ProgressReporter with no
+sleep. Record processing itself is simulated as free, so the numbers show the
+overhead the progress handling adds on top of the real work.
+
+Usage:
+    python benchmarks/progress_benchmark.py --records 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from progress import ProgressReporter
+
+class CountingReporter(ProgressReporter):
+    """Reporter that counts renders instead of drawing anything."""
+
+    def render(self, processed, percent):
+        pass
+
+def run_before(records):
+    """Old loop: render every record and sleep 0.1s."""
+    renders = 0
+    start = time.perf_counter()
+    for processed in range(1, records + 1):
+        renders += 1
+        time.sleep(0.1)
+    return time.perf_counter() - start, renders
+
+def run_after(records):
+    """New loop: throttled reporter, no sleep."""
+    reporter = CountingReporter()
+    start = time.perf_counter()
+    reporter.start(records)
+    for processed in range(1, records + 1):
+        reporter.update(processed)
+    reporter.finish()
+    return time.perf_counter() - start, reporter.renders
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=50,
+                        help="records to run through the old loop (it sleeps 0.1s each)")
+    parser.add_argument("--after-records", type=int, default=5000,
+                        help="records to run through the new loop")
+    args = parser.parse_args()
+
+    before_time, before_renders = run_before(args.records)
+    after_time, after_renders = run_after(args.after_records)
+    projected_before = before_time / args.records * args.after_records
+
+    print(f"{'loop':<8}{'records':>10}{'renders':>10}{'seconds':>12}")
+    print(f"{'before':<8}{args.records:>10}{before_renders:>10}{before_time:>12.3f}")
+    print(f"{'after':<8}{args.after_records:>10}{after_renders:>10}{after_time:>12.3f}")
+    print(f"Projected old loop for {args.after_records} records: {projected_before:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and field access of dict/list rows versus records.py namedtuples.
+
+Builds the same synthetic enrollments as per-row dicts (the old get_enrollments)
+and as records.Enrollment, and the same funds input rows as lists (the old
+run_check rows), as plain tuples (funds_math.input_row) and as a 14-field
+namedtuple. tracemalloc measures what each representation allocates on top of
+the raw cursor rows, and a read loop times the field accesses the check's hot
+loop makes.
+
+Usage:
+    python benchmarks/records_benchmark.py --rows 100000
+"""
+
+import argparse
+import datetime
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import funds_math
+from records import Enrollment
+
+# A namedtuple over funds_math.INPUT_COLUMNS, for comparison with the plain tuples.
+FundsInputRecord = namedtuple('FundsInputRecord', [f"f{i}" for i in range(len(funds_math.INPUT_COLUMNS))])
+
+def make_cursor_rows(count):
+    """Rows shaped like the get_enrollments result set."""
+    start = datetime.date(2024, 9, 1)
+    return [(100000 + i, start, f"P{i % 40:03d}", "CPW"[i % 3], i % 4 + 1) for i in range(count)]
+
+def enrollment_dicts(rows):
+    return [
+        {'student_id': row[0],
+         'start_date': row[1],
+         'program': row[2],
+         'status': row[3],
+         'enrollment_number': row[4]}
+        for row in rows
+    ]
+
+def enrollment_records(rows):
+    return list(map(Enrollment._make, rows))
+
+def funds_lists(enrollments):
+    return [[e[0], "First", "Last", e[2], e[1], "T1", e[3], 1200.0, 800.0, 2400.0, 12.0, 350.0, 36.0, "link"]
+            for e in enrollments]
+
+def funds_tuples(enrollments):
+    return [(e[0], "First", "Last", e[2], e[1], "T1", e[3], 1200.0, 800.0, 2400.0, 12.0, 350.0, 36.0, "link")
+            for e in enrollments]
+
+def funds_records(enrollments):
+    return [FundsInputRecord(e[0], "First", "Last", e[2], e[1], "T1", e[3], 1200.0, 800.0, 2400.0, 12.0, 350.0, 36.0, "link")
+            for e in enrollments]
+
+def measure(build, source):
+    """Return (allocated bytes still held, peak bytes, seconds) for build(source)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(source)
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak, seconds
+
+def time_reads(enrollments, read):
+    start = time.perf_counter()
+    for enrollment in enrollments:
+        read(enrollment)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000, help="enrollments to build")
+    args = parser.parse_args()
+
+    rows = make_cursor_rows(args.rows)
+    tuples = [tuple(row) for row in rows]
+
+    print(f"{'representation':<26}{'held MiB':>10}{'peak MiB':>10}{'bytes/row':>11}{'build s':>9}")
+    for label, build, source in (
+        ("enrollment dicts", enrollment_dicts, rows),
+        ("Enrollment records", enrollment_records, rows),
+        ("funds input lists", funds_lists, tuples),
+        ("funds input tuples", funds_tuples, tuples),
+        ("funds input namedtuples", funds_records, tuples),
+    ):
+        current, peak, seconds = measure(build, source)
+        print(f"{label:<26}{current / 2**20:>10.1f}{peak / 2**20:>10.1f}{current / args.rows:>11.0f}{seconds:>9.3f}")
+
+    dicts = enrollment_dicts(rows)
+    records = enrollment_records(rows)
+    dict_read = time_reads(dicts, lambda e: (e['student_id'], e['start_date'], e['program'], e['status']))
+    attr_read = time_reads(records, lambda e: (e.student_id, e.start_date, e.program, e.status))
+    unpack_read = time_reads(records, lambda e: e[:4])
+    print(f"Reading four fields of {args.rows} enrollments: dict keys {dict_read:.3f}s, "
+          f"record attributes {attr_read:.3f}s, record slice {unpack_read:.3f}s")
+
+if __name__ == '__main__':
+    main()
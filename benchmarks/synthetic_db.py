@@ -0,0 +1,214 @@
+"""
+SQLite stand-in for the MySQL database, used by the benchmarks.
+
+populate() writes the seven tables the checks read (termlist, enrollments,
+programs, accountledger, disbursements, transcript, students) for a given number
+of students, deterministically from a seed. The active term runs from 30 days
+ago to 60 days from now, so the checks always find it. The data keeps the quirks
+the checks handle: repeated latest enrollments, inactive and missing programs,
+empty and non-numeric COACODEs, and students without a name row.
+
+connect() returns a connection that accepts the checks' MySQL-flavoured SQL
+(%s placeholders, the schema prefix) and counts every statement in
+QUERY_COUNTER, including those sent through AsyncConnection.
+"""
+
+import datetime
+import itertools
+import random
+import sqlite3
+import threading
+
+SCHEMA = '''
+CREATE TABLE termlist (TERMCODE TEXT, STARTDATE TEXT, ENDDATE TEXT, ACTIVE INTEGER);
+CREATE TABLE enrollments (ID INTEGER, STARTDATE TEXT, PROGRAM TEXT, STATUS TEXT,
+                          ENROLLMENTNUMBER INTEGER, TYPE TEXT, CREDIT NUMERIC);
+CREATE TABLE programs (PROGRAMCODE TEXT, COACODE TEXT, ACTIVE INTEGER);
+CREATE TABLE accountledger (ID INTEGER, TRANSACTIONCODE TEXT, TRANSACTIONAMOUNT NUMERIC, TRANSACTIONDATE TEXT);
+CREATE TABLE disbursements (ID INTEGER, NETAMOUNTSCHED NUMERIC, DATESCHED TEXT, DISBSTATUS TEXT, ENROLLMENTNUMBER INTEGER);
+CREATE TABLE transcript (ID INTEGER, CREDIT NUMERIC, STARTDATE TEXT, ENDDATE TEXT);
+CREATE TABLE students (ID INTEGER, FNAME TEXT, LNAME TEXT);
+CREATE INDEX enrollments_id ON enrollments (ID);
+CREATE INDEX accountledger_id ON accountledger (ID);
+CREATE INDEX disbursements_id ON disbursements (ID);
+CREATE INDEX transcript_id ON transcript (ID);
+CREATE INDEX students_id ON students (ID);
+CREATE INDEX programs_code ON programs (PROGRAMCODE);
+'''
+
+PROGRAM_COUNT = 40
+FIRST_STUDENT_ID = 100000
+
+class QueryCounter:
+    """Thread-safe count of executed statements."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+QUERY_COUNTER = QueryCounter()
+
+def _translate(query):
+    """Rewrite the checks' MySQL SQL for SQLite."""
+    return query.replace('%s', '?').replace('`mediatechcloud_sdb`.', '')
+
+# ---------------- Data ---------------- #
+
+def _student_rows(rng, student_id, today, term_start, programs):
+    """Generate every row for one student, keyed by table."""
+    rows = {'enrollments': [], 'accountledger': [], 'disbursements': [], 'transcript': [], 'students': []}
+    enrollment_count = rng.randint(1, 3)
+    for number in range(1, enrollment_count + 1):
+        rows['enrollments'].append((
+            student_id,
+            (today - datetime.timedelta(days=rng.randint(0, 900))).isoformat(),
+            rng.choice(programs),
+            rng.choice("CPWXA"),
+            number,
+            rng.choice("EEEF"),
+            rng.choice([None, 24, 36, 60.5]),
+        ))
+    if rng.random() < 0.05:
+        # A second row for the latest enrollment number, reported as a duplicate
+        rows['enrollments'].append((student_id, term_start, rng.choice(programs), "C", enrollment_count, "E", 30))
+    for _ in range(rng.randint(0, 4)):
+        date = (today - datetime.timedelta(days=rng.randint(-90, 120))).isoformat()
+        rows['accountledger'].append((student_id, rng.choice(["Tuition", "Fee"]), rng.randint(100, 5000), date))
+    for _ in range(rng.randint(0, 5)):
+        date = (today - datetime.timedelta(days=rng.randint(-90, 400))).isoformat()
+        rows['disbursements'].append((student_id, rng.randint(100, 4000), date, rng.choice("SXPD"),
+                                      rng.randint(1, enrollment_count)))
+    for _ in range(rng.randint(0, 4)):
+        start = today - datetime.timedelta(days=rng.randint(0, 300))
+        end = start + datetime.timedelta(days=rng.randint(10, 120))
+        rows['transcript'].append((student_id, rng.choice([3, 4, 1.5]), start.isoformat(), end.isoformat()))
+    if rng.random() > 0.03:
+        rows['students'].append((student_id, f"First{student_id}", f"Last{student_id}"))
+    return rows
+
+def populate(path, students=1000, seed=1):
+    """Create the database at `path` with `students` students."""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    term_start = (today - datetime.timedelta(days=30)).isoformat()
+    term_end = (today + datetime.timedelta(days=60)).isoformat()
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.execute("INSERT INTO termlist VALUES ('T1', ?, ?, 1)", (term_start, term_end))
+
+        programs = [f"P{i:03d}" for i in range(PROGRAM_COUNT)]
+        coacodes = ['350', '400.5', '', 'abc', None, '275', '310', '299.99']
+        conn.executemany("INSERT INTO programs VALUES (?, ?, ?)", [
+            (code, coacodes[i % len(coacodes)], 0 if i % 13 == 12 else 1)
+            for i, code in enumerate(programs[:-1])  # the last program has no row at all
+        ])
+
+        inserts = {
+            'enrollments': "INSERT INTO enrollments VALUES (?, ?, ?, ?, ?, ?, ?)",
+            'accountledger': "INSERT INTO accountledger VALUES (?, ?, ?, ?)",
+            'disbursements': "INSERT INTO disbursements VALUES (?, ?, ?, ?, ?)",
+            'transcript': "INSERT INTO transcript VALUES (?, ?, ?, ?)",
+            'students': "INSERT INTO students VALUES (?, ?, ?)",
+        }
+        student_ids = range(FIRST_STUDENT_ID, FIRST_STUDENT_ID + students)
+        for batch in iter(lambda it=iter(student_ids): list(itertools.islice(it, 5000)), []):
+            batch_rows = {table: [] for table in inserts}
+            for student_id in batch:
+                for table, rows in _student_rows(rng, student_id, today, term_start, programs).items():
+                    batch_rows[table].extend(rows)
+            for table, rows in batch_rows.items():
+                conn.executemany(inserts[table], rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+# ---------------- Connections ---------------- #
+
+class Cursor:
+    """DB-API cursor wrapper that translates and counts statements."""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+
+    def execute(self, query, params=()):
+        QUERY_COUNTER.add()
+        self._cursor.execute(_translate(query), params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def close(self):
+        self._cursor.close()
+
+class Connection:
+    """Stand-in for a pooled mysql.connector connection."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+    def cursor(self, buffered=False, **kwargs):
+        return Cursor(self._conn)
+
+    def is_connected(self):
+        return True
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+class AsyncCursor:
+    """Awaitable version of Cursor for async_check."""
+
+    def __init__(self, conn):
+        self._cursor = Cursor(conn)
+
+    async def execute(self, query, params=()):
+        self._cursor.execute(query, params)
+
+    async def fetchone(self):
+        return self._cursor.fetchone()
+
+    async def close(self):
+        self._cursor.close()
+
+class AsyncConnection:
+    """Stand-in for a mysql.connector.aio connection."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+    async def cursor(self, buffered=False, **kwargs):
+        return AsyncCursor(self._conn)
+
+    async def close(self):
+        self._conn.close()
+
+def connect(path):
+    """Open a connection to the stand-in database."""
+    return Connection(path)
+
+async def connect_async(path):
+    """Open an async connection to the stand-in database."""
+    return AsyncConnection(path)
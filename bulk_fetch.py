@@ -0,0 +1,220 @@
+"""
+Set-based data loading for the Student Funds Check.
+
+Each fetch function below replaces one of the per-student helpers in app.py with
+a single grouped query over every student in the term, built by the matching
+build_*_query function (index_report.py EXPLAINs the same builders). The results
+are keyed by student ID (or program code) so run_check can join them in memory.
+"""
+
+import logging
+
+import mysql.connector
+
+from records import StudentFunds
+
+# Students considered by get_enrollments; used to restrict every grouped query.
+TERM_STUDENTS_QUERY = '''
+    SELECT ID
+    FROM `enrollments`
+    WHERE `STATUS` IN ("C", "P", "W")
+      AND `TYPE` = 'E'
+'''
+
+# Every active program's raw COACODE.
+PROGRAM_COACODES_QUERY = '''
+    SELECT PROGRAMCODE, COACODE
+    FROM `programs`
+    WHERE `ACTIVE` = 1;
+'''
+
+# ---------------- Grouped Queries ---------------- #
+
+def _term_students(student_ids=None):
+    """Return the term-students subquery and its parameters, optionally limited to student_ids."""
+    if student_ids is None:
+        return TERM_STUDENTS_QUERY, ()
+    student_ids = tuple(student_ids)
+    placeholders = ", ".join(["%s"] * len(student_ids)) or "NULL"
+    return f"{TERM_STUDENTS_QUERY} AND `ID` IN ({placeholders})", student_ids
+
+def _fetch_grouped(db, query, params, name):
+    """Run a grouped query and return {key: value} for its first two columns."""
+    cursor = db.cursor(buffered=True)
+    try:
+        cursor.execute(query, params)
+        grouped = {}
+        for row in cursor.fetchall():
+            # Keep the first row per key, matching the per-student fetchone() calls.
+            grouped.setdefault(row[0], row[1] if len(row) == 2 else row[1:])
+        logging.info(f"Bulk {name}: {len(grouped)} rows loaded.")
+        return grouped
+    except mysql.connector.Error as e:
+        logging.error(f"Error in bulk {name}: {e}")
+        return {}
+    finally:
+        cursor.close()
+
+def build_tuition_amounts_query(term_start_date, term_end_date, student_ids=None):
+    """Return the grouped tuition query and its parameters."""
+    students_query, students_params = _term_students(student_ids)
+    query = f'''
+    SELECT ID, SUM(TRANSACTIONAMOUNT) as tuition_amount
+    FROM `accountledger`
+    WHERE `TRANSACTIONCODE` = "Tuition"
+      AND `TRANSACTIONDATE` <= %s
+      AND `TRANSACTIONDATE` >= %s
+      AND `ID` IN ({students_query})
+    GROUP BY ID;
+    '''
+    return query, (term_end_date, term_start_date) + students_params
+
+def build_term_scheduled_funds_query(term_start_date, term_end_date, filter_disbstatus_x, student_ids=None):
+    """Return the grouped term scheduled funds query and its parameters."""
+    students_query, students_params = _term_students(student_ids)
+    status_clause = 'AND `DISBSTATUS` NOT IN ("X")' if filter_disbstatus_x else ''
+    query = f'''
+    SELECT ID, SUM(NETAMOUNTSCHED) as term_scheduled_funds
+    FROM `disbursements`
+    WHERE `DATESCHED` >= %s
+      AND `DATESCHED` <= %s
+      {status_clause}
+      AND `ID` IN ({students_query})
+    GROUP BY ID;
+    '''
+    return query, (term_start_date, term_end_date) + students_params
+
+def build_total_scheduled_funds_query(filter_disbstatus_x, student_ids=None):
+    """Return the grouped total scheduled funds query and its parameters."""
+    students_query, students_params = _term_students(student_ids)
+    status_clause = 'WHERE d.DISBSTATUS NOT IN ("X")' if filter_disbstatus_x else ''
+    query = f'''
+    SELECT d.ID, SUM(d.NETAMOUNTSCHED) as total_scheduled_funds
+    FROM disbursements d
+    JOIN (
+        SELECT ID, MAX(ENROLLMENTNUMBER) AS maxEnroll
+        FROM enrollments
+        WHERE ID IN ({students_query})
+        GROUP BY ID
+    ) latest ON d.ID = latest.ID AND d.ENROLLMENTNUMBER = latest.maxEnroll
+    {status_clause}
+    GROUP BY d.ID;
+    '''
+    return query, students_params
+
+def build_term_credits_query(term_start_date, term_end_date, student_ids=None):
+    """Return the grouped term credits query and its parameters."""
+    students_query, students_params = _term_students(student_ids)
+    query = f'''
+    SELECT ID, SUM(CREDIT) as total_credits
+    FROM `mediatechcloud_sdb`.`transcript`
+    WHERE `ENDDATE` >= %s
+      AND `STARTDATE` <= %s
+      AND `ID` IN ({students_query})
+    GROUP BY ID;
+    '''
+    return query, (term_start_date, term_end_date) + students_params
+
+def build_enrollment_credits_query(student_ids=None):
+    """Return the enrollment credits query and its parameters."""
+    students_clause, students_params = '', ()
+    if student_ids is not None:
+        students_query, students_params = _term_students(student_ids)
+        students_clause = f"AND `ID` IN ({students_query})"
+    query = f'''
+    SELECT ID, CREDIT as total_enrollment_credits
+    FROM `enrollments`
+    WHERE `STATUS` IN ("C", "P", "W")
+      AND `TYPE` = 'E'
+      {students_clause};
+    '''
+    return query, students_params
+
+def build_student_names_query(student_ids=None):
+    """Return the student names query and its parameters."""
+    students_query, students_params = _term_students(student_ids)
+    query = f'''
+    SELECT ID, FNAME, LNAME
+    FROM students
+    WHERE ID IN ({students_query});
+    '''
+    return query, students_params
+
+def fetch_tuition_amounts(db, term_start_date, term_end_date, student_ids=None):
+    """Return {student_id: tuition sum} from the account ledger for the term."""
+    query, params = build_tuition_amounts_query(term_start_date, term_end_date, student_ids)
+    return _fetch_grouped(db, query, params, "tuition amounts")
+
+def fetch_term_scheduled_funds(db, term_start_date, term_end_date, filter_disbstatus_x, student_ids=None):
+    """Return {student_id: scheduled funds} for disbursements dated within the term."""
+    query, params = build_term_scheduled_funds_query(term_start_date, term_end_date, filter_disbstatus_x, student_ids)
+    return _fetch_grouped(db, query, params, "term scheduled funds")
+
+def fetch_total_scheduled_funds(db, filter_disbstatus_x, student_ids=None):
+    """Return {student_id: scheduled funds} for each student's latest enrollment number."""
+    query, params = build_total_scheduled_funds_query(filter_disbstatus_x, student_ids)
+    return _fetch_grouped(db, query, params, "total scheduled funds")
+
+def fetch_term_credits(db, term_start_date, term_end_date, student_ids=None):
+    """Return {student_id: transcript credits} for courses overlapping the term."""
+    query, params = build_term_credits_query(term_start_date, term_end_date, student_ids)
+    return _fetch_grouped(db, query, params, "term credits")
+
+def fetch_enrollment_credits(db, student_ids=None):
+    """Return {student_id: enrollment credits} using the first matching enrollment row."""
+    query, params = build_enrollment_credits_query(student_ids)
+    return _fetch_grouped(db, query, params, "enrollment credits")
+
+def fetch_program_coacodes(db):
+    """Return {program_code: raw COACODE} for every active program."""
+    return _fetch_grouped(db, PROGRAM_COACODES_QUERY, (), "program COACODEs")
+
+def fetch_student_names(db, student_ids=None):
+    """Return {student_id: (first name, last name)} for every student in the term."""
+    query, params = build_student_names_query(student_ids)
+    return _fetch_grouped(db, query, params, "student names")
+
+# ---------------- In-Memory Join ---------------- #
+
+def load_term_data(db, term_start_date, term_end_date, filter_disbstatus_x, student_ids=None):
+    """
+    Load every per-student aggregate for the term with one query per table.
+    Pass student_ids to load only those students (used by the streaming batches).
+    """
+    return {
+        'tuition': fetch_tuition_amounts(db, term_start_date, term_end_date, student_ids),
+        'term_funds': fetch_term_scheduled_funds(db, term_start_date, term_end_date, filter_disbstatus_x, student_ids),
+        'total_funds': fetch_total_scheduled_funds(db, filter_disbstatus_x, student_ids),
+        'credits': fetch_term_credits(db, term_start_date, term_end_date, student_ids),
+        'enrollment_credits': fetch_enrollment_credits(db, student_ids),
+        'names': fetch_student_names(db, student_ids),
+    }
+
+def lookup_student_funds(term_data, enrollment, prices):
+    """
+    Return the same values as app.fetch_student_funds, read from preloaded term data
+    and a program_prices.ProgramPriceIndex.
+    """
+    student_id = enrollment.student_id
+
+    tuition_amount = term_data['tuition'].get(student_id)
+    term_scheduled_funds = term_data['term_funds'].get(student_id)
+    total_scheduled_funds = term_data['total_funds'].get(student_id)
+    total_credits = term_data['credits'].get(student_id)
+    total_enrollment_credits = term_data['enrollment_credits'].get(student_id)
+
+    names = term_data['names'].get(student_id)
+    if names is None:
+        logging.warning("No name found for Student ID %s.", student_id)
+        names = ("", "")
+
+    return StudentFunds(
+        tuition_amount=float(tuition_amount) if tuition_amount is not None else "No Tuition",
+        term_scheduled_funds=float(term_scheduled_funds) if term_scheduled_funds is not None else 0.0,
+        total_scheduled_funds=float(total_scheduled_funds) if total_scheduled_funds is not None else 0.0,
+        total_credits=float(total_credits) if total_credits is not None else 0.0,
+        total_enrollment_credits=float(total_enrollment_credits) if total_enrollment_credits is not None else 0.0,
+        price_per_credit=prices.price(enrollment.program),
+        first_name=names[0],
+        last_name=names[1],
+    )
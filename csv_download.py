@@ -1,24 +1,39 @@
 #!/usr/bin/env python3
-import os
 import csv
-import time
+import io
 import logging
 import datetime
+import os
 from collections import defaultdict
 
-from flask import Blueprint, send_file, abort
+from flask import Blueprint, Response, jsonify, send_file, abort, stream_with_context
 import mysql.connector
 
+import jobs
+import singleflight
+from db_pool import connect_to_db
+from funds_store import atomic_output
+from progress import PrintProgressReporter
+from records import Enrollment
+
+# File written by run_csv_check; background jobs write their own copy next to it (see job_csv_file).
+CSV_FILE = "/tmp/student_funds.csv"
+
+# Rows fetched from the server-side cursor per round trip while streaming.
+FETCH_BATCH_SIZE = int(os.getenv('CSV_FETCH_BATCH_SIZE', 1000))
+
+# For demonstration, only a few columns are written.
+CSV_HEADER = [
+    "Student ID",
+    "Program",
+    "Start Date",
+    "Term Code",
+    "Status"
+]
+
 # Create the blueprint
 csv_download_bp = Blueprint('csv_download', __name__)
 
-# Database credentials (adjust or use environment variables as needed)
-DB_HOST = os.getenv('DB_HOST', 'campuscloud-public.mdb0002003.db.skysql.net')
-DB_USER = os.getenv('DB_USER', 'russell')
-DB_PASSWORD = os.getenv('DB_PASSWORD', 'Ab4W034#72ecqe')
-DB_NAME = os.getenv('DB_NAME', 'mediatechcloud_sdb')
-DB_PORT = int(os.getenv('DB_PORT', 5002))
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,23 +42,6 @@ logging.basicConfig(
 
 # ---------------- Database Functions ---------------- #
 
-def connect_to_db():
-    """Establish a connection to the MySQL database."""
-    try:
-        connection = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            port=DB_PORT
-        )
-        if connection.is_connected():
-            logging.info("Successfully connected to the database.")
-        return connection
-    except mysql.connector.Error as e:
-        logging.error(f"Error connecting to database: {e}")
-        return None
-
 def get_current_date():
     """Return the current date in YYYY-MM-DD format."""
     current_date = datetime.datetime.now().strftime('%Y-%m-%d')
@@ -90,14 +88,7 @@ def get_enrollments(db):
         """
         cursor.execute(query)
         results = cursor.fetchall()
-        enrollments = [
-            {'student_id': row[0],
-             'start_date': row[1],
-             'program': row[2],
-             'status': row[3],
-             'enrollment_number': row[4]}
-            for row in results
-        ]
+        enrollments = list(map(Enrollment._make, results))
         logging.info(f"Number of most recent enrollments found: {len(enrollments)}")
         return enrollments
     except mysql.connector.Error as e:
@@ -106,13 +97,85 @@ def get_enrollments(db):
     finally:
         cursor.close()
 
+def iter_enrollment_rows(db, term_code, batch_size=FETCH_BATCH_SIZE):
+    """
+    Yield CSV rows for the most recent enrollments, ordered by student ID,
+    reading them from an unbuffered cursor in fetchmany batches.
+    """
+    cursor = db.cursor()
+    exhausted = False
+    try:
+        query = """
+        SELECT e.ID, e.STARTDATE, e.PROGRAM, e.STATUS
+        FROM enrollments e
+        JOIN (
+            SELECT ID, MAX(ENROLLMENTNUMBER) AS maxEnroll
+            FROM enrollments
+            WHERE STATUS IN ("C", "P", "W", "X") AND TYPE = 'E'
+            GROUP BY ID
+        ) latest ON e.ID = latest.ID AND e.ENROLLMENTNUMBER = latest.maxEnroll
+        WHERE e.STATUS IN ("C", "P", "W", "X")
+        ORDER BY e.ID;
+        """
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                exhausted = True
+                break
+            yield [[row[0], row[2], row[1], term_code, row[3]] for row in rows]
+    finally:
+        if not exhausted:
+            # The client went away mid-stream: drain the result so the connection can be reused.
+            db.consume_results()
+        cursor.close()
+
+def generate_csv(db, term_code):
+    """
+    Yield the CSV as text chunks, one per fetched batch. A database error mid-stream
+    is re-raised so the transfer fails instead of ending as a truncated file.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    processed_count = 0
+    try:
+        writer.writerow(CSV_HEADER)
+        yield buffer.getvalue()
+        for rows in iter_enrollment_rows(db, term_code):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            processed_count += len(rows)
+            yield buffer.getvalue()
+        logging.info(f"Streamed CSV with {processed_count} records.")
+    except mysql.connector.Error as e:
+        logging.error(f"Error while streaming CSV: {e}")
+        raise
+
 # ---------------- CSV Generation Function ---------------- #
 
-def run_csv_check():
+def run_csv_check(progress=None, csv_file=None):
     """
-    Connect to the database, run the necessary queries, generate the main CSV file,
-    and return True if successful.
+    Connect to the database, run the necessary queries, generate the main CSV file
+    (`csv_file`, CSV_FILE by default), and return True if successful. `progress` is
+    an optional progress.ProgressReporter (printed progress by default).
     """
+    current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    csv_file = csv_file or CSV_FILE
+    return singleflight.group(f"{__name__}.run_csv_check").do((current_date, csv_file), _run_csv_check, progress, csv_file)
+
+def job_csv_file(job_id):
+    """Return the CSV path of one background job, so later jobs cannot overwrite its download."""
+    root, ext = os.path.splitext(CSV_FILE)
+    return f"{root}.{job_id}{ext}"
+
+def run_csv_job(reporter):
+    """Background job body: write the job's own CSV and return its path, or None if the check failed."""
+    csv_file = job_csv_file(reporter.job_id)
+    return csv_file if run_csv_check(reporter, csv_file) else None
+
+def _run_csv_check(progress, csv_file):
+    """Body of run_csv_check, run once per set of concurrent callers."""
     db = connect_to_db()
     if not db:
         return False
@@ -123,37 +186,29 @@ def run_csv_check():
             logging.warning("No active term found. Exiting...")
             return False
         enrollments = get_enrollments(db)
-        enrollments = sorted(enrollments, key=lambda x: x['student_id'])
-        csv_file = "/tmp/student_funds.csv"
+        enrollments = sorted(enrollments, key=lambda x: x.student_id)
         
-        with open(csv_file, mode='w', newline='') as file:
+        with atomic_output(csv_file) as temp_path, open(temp_path, mode='w', newline='') as file:
             writer = csv.writer(file)
-            # For demonstration, only a few columns are written.
-            header = [
-                "Student ID",
-                "Program",
-                "Start Date",
-                "Term Code",
-                "Status"
-            ]
-            writer.writerow(header)
+            writer.writerow(CSV_HEADER)
             
             total_records = len(enrollments)
             processed_count = 0
+            reporter = progress if progress is not None else PrintProgressReporter()
+            reporter.start(total_records)
             for enrollment in enrollments:
-                row = [
-                    enrollment['student_id'],
-                    enrollment['program'],
-                    enrollment['start_date'],
+                row = (
+                    enrollment.student_id,
+                    enrollment.program,
+                    enrollment.start_date,
                     term_code,
-                    enrollment['status']
-                ]
+                    enrollment.status
+                )
                 writer.writerow(row)
                 processed_count += 1
-                percent_complete = int((processed_count / total_records) * 100)
-                print(f"Processing record {processed_count} of {total_records} ({percent_complete}%)")
-                time.sleep(0.1)
-                
+                reporter.update(processed_count)
+            reporter.finish()
+
             logging.info(f"CSV file '{csv_file}' created successfully with {processed_count} records.")
         return True
     except Exception as e:
@@ -161,26 +216,38 @@ def run_csv_check():
         return False
     finally:
         db.close()
-        logging.info("Database connection closed.")
+        logging.info("Database connection returned to the pool.")
 
 # ---------------- Blueprint Routes ---------------- #
 
 @csv_download_bp.route('/download_csv', methods=['GET'])
 def download_csv():
     """
-    Run the CSV check function and return the main CSV file as a downloadable attachment.
+    Stream the main CSV to the client as it is read from the database,
+    without building the file first.
     """
-    if run_csv_check():
-        try:
-            return send_file("/tmp/student_funds.csv",
-                             mimetype="text/csv",
-                             attachment_filename="student_funds.csv",
-                             as_attachment=True)
-        except Exception as e:
-            logging.error(f"Error sending file: {e}")
-            abort(500)
-    else:
+    db = connect_to_db()
+    if not db:
         abort(500)
+    term_code, term_start_date, term_end_date = get_term_dates(db, get_current_date())
+    if not term_start_date or not term_end_date:
+        logging.warning("No active term found. Exiting...")
+        db.close()
+        abort(500)
+    response = Response(
+        stream_with_context(generate_csv(db, term_code)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=student_funds.csv"}
+    )
+
+    def close_db():
+        db.close()
+        logging.info("Database connection returned to the pool.")
+
+    # Closing the response returns the connection, even when the body is never
+    # iterated (HEAD requests, clients that disconnect before the first chunk).
+    response.call_on_close(close_db)
+    return response
 
 @csv_download_bp.route('/download_duplicate_csv', methods=['GET'])
 def download_duplicate_csv():
@@ -208,4 +275,40 @@ def download_duplicate_csv():
                          as_attachment=True)
     except Exception as e:
         logging.error(f"Error sending duplicate file: {e}")
-        abort(500)
\ No newline at end of file
+        abort(500)
+
+@csv_download_bp.route('/jobs/csv_check', methods=['POST'])
+def submit_csv_job():
+    """
+    Start the CSV check in the background (or join the identical one already
+    running) and return its job ID for polling.
+    """
+    # Every job writes its own CSV (job_csv_file), removed once the job expires
+    job_id = jobs.submit("csv_check", (get_current_date(),), run_csv_job, owns_artifacts=True)
+    return jsonify({'job_id': job_id}), 202
+
+@csv_download_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Return the status and progress of a background job."""
+    job = jobs.get_job(job_id)
+    if job is None:
+        abort(404)
+    job.pop('artifact')
+    return jsonify(job)
+
+@csv_download_bp.route('/jobs/<job_id>/download', methods=['GET'])
+def download_job_csv(job_id):
+    """Return the CSV produced by a finished background job."""
+    job = jobs.get_job(job_id)
+    if job is None:
+        abort(404)
+    if job['status'] != jobs.DONE:
+        abort(409)
+    try:
+        return send_file(job['artifact'],
+                         mimetype="text/csv",
+                         download_name="student_funds.csv",
+                         as_attachment=True)
+    except Exception as e:
+        logging.error(f"Error sending job file: {e}")
+        abort(500)
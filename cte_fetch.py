@@ -0,0 +1,179 @@
+"""
+Single-statement loading for the Student Funds Check ("cte" mode).
+
+One query with common table expressions picks each student's latest enrollment,
+as get_enrollments does, and joins every per-student aggregate onto it: tuition,
+term and total scheduled funds (honoring FILTER_DISBSTATUS_X), term credits,
+enrollment credits, the program's raw COACODE and the student's name. The whole
+report is one server-side execution and one result transfer; Python only parses
+the COACODEs and formats the rows.
+
+Where the per-student helpers take the first row of a lookup (LIMIT 1 or
+fetchone), the statement keeps the first row per key with ROW_NUMBER().
+"""
+
+import logging
+
+import mysql.connector
+
+from program_prices import ProgramPriceIndex
+from records import Enrollment, StudentFunds
+
+# Column positions in the statement's result.
+(
+    STUDENT_ID, START_DATE, PROGRAM, STATUS, ENROLLMENT_NUMBER,
+    TUITION, TERM_FUNDS, TOTAL_FUNDS, CREDITS, ENROLLMENT_CREDITS,
+    COACODE, FIRST_NAME, LAST_NAME, HAS_NAME,
+) = range(14)
+
+def build_term_funds_query(term_start_date, term_end_date, filter_disbstatus_x):
+    """Return the CTE statement and its parameters."""
+    status_clause = 'AND d.DISBSTATUS NOT IN ("X")' if filter_disbstatus_x else ''
+    query = f'''
+    WITH latest AS (
+        SELECT e.ID, e.STARTDATE, e.PROGRAM, e.STATUS, e.ENROLLMENTNUMBER
+        FROM enrollments e
+        JOIN (
+            SELECT ID, MAX(ENROLLMENTNUMBER) AS maxEnroll
+            FROM enrollments
+            WHERE STATUS IN ("C", "P", "W") AND TYPE = 'E'
+            GROUP BY ID
+        ) latest_number ON e.ID = latest_number.ID AND e.ENROLLMENTNUMBER = latest_number.maxEnroll
+        WHERE e.STATUS IN ("C", "P", "W")
+    ),
+    term_students AS (
+        SELECT DISTINCT ID FROM latest
+    ),
+    tuition AS (
+        SELECT a.ID, SUM(a.TRANSACTIONAMOUNT) AS tuition_amount
+        FROM accountledger a
+        JOIN term_students s ON a.ID = s.ID
+        WHERE a.TRANSACTIONCODE = "Tuition"
+          AND a.TRANSACTIONDATE <= %s
+          AND a.TRANSACTIONDATE >= %s
+        GROUP BY a.ID
+    ),
+    term_funds AS (
+        SELECT d.ID, SUM(d.NETAMOUNTSCHED) AS term_scheduled_funds
+        FROM disbursements d
+        JOIN term_students s ON d.ID = s.ID
+        WHERE d.DATESCHED >= %s
+          AND d.DATESCHED <= %s
+          {status_clause}
+        GROUP BY d.ID
+    ),
+    max_enrollment AS (
+        SELECT en.ID, MAX(en.ENROLLMENTNUMBER) AS maxEnroll
+        FROM enrollments en
+        JOIN term_students s ON en.ID = s.ID
+        GROUP BY en.ID
+    ),
+    total_funds AS (
+        SELECT d.ID, SUM(d.NETAMOUNTSCHED) AS total_scheduled_funds
+        FROM disbursements d
+        JOIN max_enrollment m ON d.ID = m.ID AND d.ENROLLMENTNUMBER = m.maxEnroll
+        WHERE 1 = 1
+          {status_clause}
+        GROUP BY d.ID
+    ),
+    credits AS (
+        SELECT t.ID, SUM(t.CREDIT) AS total_credits
+        FROM transcript t
+        JOIN term_students s ON t.ID = s.ID
+        WHERE t.ENDDATE >= %s
+          AND t.STARTDATE <= %s
+        GROUP BY t.ID
+    ),
+    enrollment_credits AS (
+        SELECT ID, CREDIT AS total_enrollment_credits
+        FROM (
+            SELECT en.ID, en.CREDIT, ROW_NUMBER() OVER (PARTITION BY en.ID) AS row_number_in_id
+            FROM enrollments en
+            JOIN term_students s ON en.ID = s.ID
+            WHERE en.STATUS IN ("C", "P", "W")
+              AND en.TYPE = 'E'
+        ) ranked
+        WHERE row_number_in_id = 1
+    ),
+    program_codes AS (
+        SELECT PROGRAMCODE, COACODE
+        FROM (
+            SELECT PROGRAMCODE, COACODE, ROW_NUMBER() OVER (PARTITION BY PROGRAMCODE) AS row_number_in_code
+            FROM programs
+            WHERE ACTIVE = 1
+        ) ranked
+        WHERE row_number_in_code = 1
+    ),
+    names AS (
+        SELECT ID, FNAME, LNAME
+        FROM (
+            SELECT st.ID, st.FNAME, st.LNAME, ROW_NUMBER() OVER (PARTITION BY st.ID) AS row_number_in_id
+            FROM students st
+            JOIN term_students s ON st.ID = s.ID
+        ) ranked
+        WHERE row_number_in_id = 1
+    )
+    SELECT l.ID, l.STARTDATE, l.PROGRAM, l.STATUS, l.ENROLLMENTNUMBER,
+           tuition.tuition_amount,
+           term_funds.term_scheduled_funds,
+           total_funds.total_scheduled_funds,
+           credits.total_credits,
+           enrollment_credits.total_enrollment_credits,
+           program_codes.COACODE,
+           names.FNAME, names.LNAME,
+           names.ID IS NOT NULL AS has_name
+    FROM latest l
+    LEFT JOIN tuition ON tuition.ID = l.ID
+    LEFT JOIN term_funds ON term_funds.ID = l.ID
+    LEFT JOIN total_funds ON total_funds.ID = l.ID
+    LEFT JOIN credits ON credits.ID = l.ID
+    LEFT JOIN enrollment_credits ON enrollment_credits.ID = l.ID
+    LEFT JOIN program_codes ON program_codes.PROGRAMCODE = l.PROGRAM
+    LEFT JOIN names ON names.ID = l.ID;
+    '''
+    return query, (
+        term_end_date, term_start_date,
+        term_start_date, term_end_date,
+        term_start_date, term_end_date,
+    )
+
+def _amount(value, default=0.0):
+    return float(value) if value is not None else default
+
+def load_term_funds(db, term_start_date, term_end_date, filter_disbstatus_x):
+    """
+    Run the single statement and return (enrollments sorted by student ID, the
+    funds dict for each enrollment, a ProgramPriceIndex built from the returned COACODEs).
+    """
+    query, params = build_term_funds_query(term_start_date, term_end_date, filter_disbstatus_x)
+    cursor = db.cursor(buffered=True)
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        logging.info(f"Term funds statement returned {len(rows)} enrollments.")
+    except mysql.connector.Error as e:
+        logging.error(f"Error in load_term_funds: {e}")
+        rows = []
+    finally:
+        cursor.close()
+
+    rows.sort(key=lambda row: row[STUDENT_ID])
+    prices = ProgramPriceIndex({row[PROGRAM]: row[COACODE] for row in rows if row[COACODE] is not None})
+
+    enrollments = []
+    student_funds = []
+    for row in rows:
+        enrollments.append(Enrollment._make(row[STUDENT_ID:ENROLLMENT_NUMBER + 1]))
+        if not row[HAS_NAME]:
+            logging.warning("No name found for Student ID %s.", row[STUDENT_ID])
+        student_funds.append(StudentFunds(
+            tuition_amount=_amount(row[TUITION], "No Tuition"),
+            term_scheduled_funds=_amount(row[TERM_FUNDS]),
+            total_scheduled_funds=_amount(row[TOTAL_FUNDS]),
+            total_credits=_amount(row[CREDITS]),
+            total_enrollment_credits=_amount(row[ENROLLMENT_CREDITS]),
+            price_per_credit=prices.price(row[PROGRAM]),
+            first_name=row[FIRST_NAME] if row[HAS_NAME] else "",
+            last_name=row[LAST_NAME] if row[HAS_NAME] else "",
+        ))
+    return enrollments, student_funds, prices
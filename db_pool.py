@@ -0,0 +1,81 @@
+"""
+Shared MySQL connection pool for the Student Funds Check.
+
+app.py, susans_check.py and the Flask CSV blueprints all borrow connections
+from here instead of opening a new TLS connection for every run or request.
+
+set_connection_factory swaps the pool for another source of connections, such
+as the SQLite stand-in used by benchmarks/check_benchmark.py.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import errors, pooling
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'campuscloud-public.mdb0002003.db.skysql.net'),
+    'user': os.getenv('DB_USER', 'russell'),
+    'password': os.getenv('DB_PASSWORD', 'Ab4W034#72ecqe'),
+    'database': os.getenv('DB_NAME', 'mediatechcloud_sdb'),
+    'port': int(os.getenv('DB_PORT', 5002)),
+}
+
+# Maximum number of open connections, and how long to wait for a free one.
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# When set, connect_to_db / async_check.open_connection call these instead.
+_connection_factory = None
+_async_connection_factory = None
+
+def set_connection_factory(factory, async_factory=None):
+    """Use factory() (and `await async_factory()`) for new connections; pass None to restore the pool."""
+    global _connection_factory, _async_connection_factory
+    _connection_factory = factory
+    _async_connection_factory = async_factory
+
+def get_async_connection_factory():
+    """Return the async connection factory set by set_connection_factory, or None."""
+    return _async_connection_factory
+
+def get_pool():
+    """Return the shared connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name="student_funds",
+                pool_size=POOL_SIZE,
+                pool_reset_session=True,
+                **DB_CONFIG
+            )
+            logging.info(f"Created database connection pool with {POOL_SIZE} connections.")
+        return _pool
+
+def connect_to_db():
+    """
+    Borrow a connection from the shared pool, waiting up to POOL_TIMEOUT seconds
+    for one to become free. The pool pings each connection as it is handed out
+    and reconnects stale ones. Calling close() on the result returns it to the pool.
+    """
+    if _connection_factory is not None:
+        return _connection_factory()
+    deadline = time.monotonic() + POOL_TIMEOUT
+    while True:
+        try:
+            return get_pool().get_connection()
+        except errors.PoolError:
+            if time.monotonic() >= deadline:
+                logging.error(f"No pooled database connection became free within {POOL_TIMEOUT} seconds.")
+                return None
+            time.sleep(0.05)
+        except mysql.connector.Error as e:
+            logging.error(f"Error connecting to database: {e}")
+            return None
@@ -0,0 +1,49 @@
+"""
+Duplicate detection for the funds checks.
+
+A student ID that appears on more than one row is a duplicate, and every one of
+its rows is reported exactly once. find_duplicates works on an in-memory
+DataFrame; DuplicateWriter does the same while rows are being written, holding
+only the first row per student ID, or with `ordered` input (rows sorted by
+student ID) only the current student's.
+"""
+
+import csv
+
+def find_duplicates(funds_df, id_column="Student ID"):
+    """Return every row whose student ID occurs more than once, in table order."""
+    return funds_df[funds_df[id_column].duplicated(keep=False)]
+
+class DuplicateWriter:
+    """
+    Streaming duplicate stage: feed it each row as it is written to the main
+    file, and rows whose ID was already seen go straight to the duplicate file.
+    The first row for an ID is held back until a second one shows up. Pass
+    ordered=True when rows arrive sorted by ID to forget each ID once the next
+    one starts, so memory stays constant.
+    """
+
+    def __init__(self, file, header, id_index=0, ordered=False):
+        self._writer = csv.writer(file)
+        self._writer.writerow(header)
+        self._id_index = id_index
+        self._ordered = ordered
+        self._first_rows = {}
+        self.count = 0
+
+    def add(self, row):
+        """Check one row against the IDs seen so far."""
+        student_id = row[self._id_index]
+        if self._ordered and student_id not in self._first_rows:
+            self._first_rows.clear()
+        first_row = self._first_rows.get(student_id)
+        if first_row is None and student_id not in self._first_rows:
+            self._first_rows[student_id] = row
+            return
+        if first_row is not None:
+            # Second sighting: release the held first row, then keep only the ID.
+            self._writer.writerow(first_row)
+            self._first_rows[student_id] = None
+            self.count += 1
+        self._writer.writerow(row)
+        self.count += 1
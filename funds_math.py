@@ -0,0 +1,102 @@
+"""
+Vectorized computation stage for the Student Funds Check.
+
+run_check gathers the raw per-student inputs (ledger sums, scheduled funds,
+credits and price per credit) into a DataFrame, and compute_funds derives the
+price and need columns for every row in one pass, independent of the database.
+"""
+
+import numpy as np
+import pandas as pd
+
+NO_TUITION = "No Tuition"
+
+# Per-student link (converted to clickable HTML by the page).
+STUDENT_LINK = "https://mediatechcloud.com/index.php?name={}"
+
+# Raw inputs gathered per enrollment, in the order run_check collects them.
+INPUT_COLUMNS = [
+    "Student ID",
+    "First Name",
+    "Last Name",
+    "Program",
+    "Start Date",
+    "Term Code",
+    "Status",
+    "Tuition",
+    "Term Expected",
+    "Total Expected",
+    "Credits",
+    "Price per Credit",
+    "Overall Enrollment Credits",
+    "Link"
+]
+
+# Column order of student_funds.csv.
+FUNDS_COLUMNS = [
+    "Student ID",
+    "First Name",
+    "Last Name",
+    "Program",
+    "Start Date",
+    "Term Code",
+    "Status",
+    "Tuition",
+    "Term Expected",
+    "Total Expected",
+    "Credits",
+    "Price per Credit",
+    "Semester Price",
+    "Overall Enrollment Credits",
+    "Overall Price",
+    "Remaining Need",
+    "Link"
+]
+
+def input_row(enrollment, funds, term_code):
+    """Return the INPUT_COLUMNS row (a plain tuple) for one enrollment and its records.StudentFunds."""
+    return (
+        enrollment.student_id,
+        funds.first_name,
+        funds.last_name,
+        enrollment.program,
+        enrollment.start_date,
+        term_code,
+        enrollment.status,
+        funds.tuition_amount,
+        funds.term_scheduled_funds,
+        funds.total_scheduled_funds,
+        funds.total_credits,
+        funds.price_per_credit,
+        funds.total_enrollment_credits,
+        STUDENT_LINK.format(enrollment.student_id)
+    )
+
+def compute_funds(raw):
+    """
+    Compute Semester Price, Overall Price and Remaining Need for every row,
+    and replace missing tuition with the "No Tuition" sentinel.
+    Returns a new DataFrame with the columns in FUNDS_COLUMNS order.
+    """
+    funds = raw.copy()
+
+    price_per_credit = funds["Price per Credit"].to_numpy(dtype=float)
+    credits = funds["Credits"].to_numpy(dtype=float)
+    enrollment_credits = funds["Overall Enrollment Credits"].to_numpy(dtype=float)
+    total_expected = funds["Total Expected"].to_numpy(dtype=float)
+
+    # A zero price per credit means the program has no usable COACODE.
+    has_price = price_per_credit != 0
+    overall_price = np.where(has_price, enrollment_credits * price_per_credit, 0.0)
+    funds["Semester Price"] = np.where(has_price, credits * price_per_credit, 0.0)
+    funds["Overall Price"] = overall_price
+    funds["Remaining Need"] = overall_price - total_expected
+
+    funds["Tuition"] = with_tuition_sentinel(funds["Tuition"])
+
+    return funds[FUNDS_COLUMNS]
+
+def with_tuition_sentinel(tuition):
+    """Return tuition amounts as objects, with missing amounts replaced by "No Tuition"."""
+    tuition = pd.to_numeric(tuition, errors="coerce")
+    return tuition.astype(object).where(tuition.notna(), NO_TUITION)
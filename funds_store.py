@@ -0,0 +1,226 @@
+"""
+Storage for the computed funds table.
+
+The canonical result is a typed Parquet file (student_funds.parquet) that the
+Streamlit page memory-maps on load, so numeric columns keep their dtypes and no
+CSV has to be re-parsed on every rerun. student_funds.csv is only written as an
+export for downloads and other tools.
+
+In memory the table looks like funds_math.compute_funds output: the Tuition
+column holds the "No Tuition" sentinel. On disk Tuition is a float column with
+nulls in place of the sentinel.
+
+Every output is written to a temp file next to its target and published with an
+atomic os.replace, so readers see either the old file or the new one, never a
+partial write. After the files, save_result publishes a manifest
+(student_funds.manifest.json) with the result version, term code, row count,
+checksums and timestamp; readers key their caches on that version.
+is_published compares a table's content checksum with the manifest, so a table
+that is already published (a result_cache hit, or a rerun on unchanged data)
+is not written again and keeps its version.
+
+save_result_stream does the same for a table that arrives in batches (the
+"streaming" check mode): each batch is appended to the Parquet file as a row
+group and to both CSVs as it arrives, and everything is published once the
+last batch is written.
+"""
+
+import contextlib
+import csv
+import datetime
+import hashlib
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from duplicates import DuplicateWriter
+import funds_math
+
+RESULT_FILE = "student_funds.parquet"
+CSV_FILE = "student_funds.csv"
+DUPLICATE_CSV_FILE = "duplicate_student_funds.csv"
+MANIFEST_FILE = "student_funds.manifest.json"
+
+@contextlib.contextmanager
+def atomic_output(path, version=None):
+    """
+    Yield a temp path next to `path`; when the block succeeds it replaces `path`
+    atomically, and when it fails the temp file is removed.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{name}.{version or time.time_ns()}.{os.getpid()}.tmp")
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def file_checksum(path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def content_checksum(stored):
+    """Return the SHA-256 hex digest of a storage frame's columns, dtypes and values."""
+    digest = hashlib.sha256()
+    digest.update(repr(list(stored.dtypes.astype(str).items())).encode())
+    digest.update(pd.util.hash_pandas_object(stored, index=False).values.tobytes())
+    return digest.hexdigest()
+
+def to_storage_frame(funds_df):
+    """Return a copy of the funds table with Tuition as a nullable float column."""
+    stored = funds_df.copy()
+    stored["Tuition"] = pd.to_numeric(stored["Tuition"], errors="coerce")
+    return stored
+
+def from_storage_frame(stored):
+    """Restore the "No Tuition" sentinel on a table read from storage."""
+    stored["Tuition"] = funds_math.with_tuition_sentinel(stored["Tuition"])
+    return stored
+
+def export_csv(funds_df, csv_file=CSV_FILE):
+    """Write the funds table as CSV, exactly as run_check has always written it."""
+    with atomic_output(csv_file) as temp_path:
+        with open(temp_path, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(funds_math.FUNDS_COLUMNS)
+            writer.writerows(funds_df.itertuples(index=False, name=None))
+    logging.info(f"CSV file '{csv_file}' created successfully with {len(funds_df)} records.")
+
+def save_result(funds_df, result_file=RESULT_FILE, csv_file=CSV_FILE, term_code=None, manifest_file=MANIFEST_FILE):
+    """Publish the canonical Parquet result and its CSV export, then the manifest naming the new version."""
+    created = datetime.datetime.now()
+    stamp = created.strftime('%Y%m%dT%H%M%S%f')
+    stored = to_storage_frame(funds_df)
+    table = pa.Table.from_pandas(stored, preserve_index=False)
+    with atomic_output(result_file, stamp) as temp_path:
+        pq.write_table(table, temp_path)
+        checksum = file_checksum(temp_path)
+    logging.info(f"Result file '{result_file}' created successfully with {len(funds_df)} records.")
+    export_csv(funds_df, csv_file)
+
+    manifest = {
+        'version': f"{stamp}-{checksum[:12]}",
+        'term_code': term_code,
+        'row_count': len(funds_df),
+        'checksum': checksum,
+        'content_checksum': content_checksum(stored),
+        'created': created.isoformat(timespec='seconds'),
+        'result_file': os.path.basename(result_file),
+        'csv_file': os.path.basename(csv_file),
+    }
+    write_manifest(manifest, manifest_file)
+    return manifest
+
+def is_published(funds_df, result_file=RESULT_FILE, csv_file=CSV_FILE, term_code=None, manifest_file=MANIFEST_FILE):
+    """Return True if the published result and CSV export already hold exactly this funds table."""
+    manifest = read_manifest(manifest_file)
+    return (
+        manifest is not None
+        and manifest.get('content_checksum') == content_checksum(to_storage_frame(funds_df))
+        and manifest.get('term_code') == term_code
+        and manifest.get('result_file') == os.path.basename(result_file)
+        and manifest.get('csv_file') == os.path.basename(csv_file)
+        and os.path.exists(result_file)
+        and os.path.exists(csv_file)
+    )
+
+def save_result_stream(frames, result_file=RESULT_FILE, csv_file=CSV_FILE, duplicate_file=DUPLICATE_CSV_FILE,
+                       term_code=None, manifest_file=MANIFEST_FILE):
+    """
+    Write funds table batches (ordered by student ID) to the Parquet result, the CSV
+    export and the duplicate CSV as they arrive, then publish the manifest.
+    """
+    created = datetime.datetime.now()
+    stamp = created.strftime('%Y%m%dT%H%M%S%f')
+    row_count = 0
+    with atomic_output(result_file, stamp) as result_temp, \
+         atomic_output(csv_file) as csv_temp, \
+         atomic_output(duplicate_file) as duplicate_temp, \
+         open(csv_temp, mode='w', newline='') as csv_out, \
+         open(duplicate_temp, mode='w', newline='') as duplicate_out:
+        csv_writer = csv.writer(csv_out)
+        csv_writer.writerow(funds_math.FUNDS_COLUMNS)
+        duplicate_writer = DuplicateWriter(duplicate_out, funds_math.FUNDS_COLUMNS, ordered=True)
+        parquet_writer = None
+        try:
+            for frame in frames:
+                # Later batches are coerced to the first batch's schema
+                schema = parquet_writer.schema if parquet_writer is not None else None
+                table = pa.Table.from_pandas(to_storage_frame(frame), schema=schema, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(result_temp, table.schema)
+                parquet_writer.write_table(table)
+
+                rows = list(frame.itertuples(index=False, name=None))
+                csv_writer.writerows(rows)
+                for row in rows:
+                    duplicate_writer.add(row)
+                csv_out.flush()
+                row_count += len(rows)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+        if parquet_writer is None:
+            empty = to_storage_frame(pd.DataFrame(columns=funds_math.FUNDS_COLUMNS))
+            pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), result_temp)
+        checksum = file_checksum(result_temp)
+    logging.info(f"Result file '{result_file}' created successfully with {row_count} records.")
+    logging.info(f"CSV file '{csv_file}' created successfully with {row_count} records.")
+    logging.info(f"CSV file '{duplicate_file}' created successfully with {duplicate_writer.count} records.")
+
+    manifest = {
+        'version': f"{stamp}-{checksum[:12]}",
+        'term_code': term_code,
+        'row_count': row_count,
+        'checksum': checksum,
+        'created': created.isoformat(timespec='seconds'),
+        'result_file': os.path.basename(result_file),
+        'csv_file': os.path.basename(csv_file),
+    }
+    write_manifest(manifest, manifest_file)
+    return manifest
+
+def write_manifest(manifest, manifest_file=MANIFEST_FILE):
+    """Atomically publish a result manifest."""
+    with atomic_output(manifest_file) as temp_path:
+        with open(temp_path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+    logging.info(f"Published result version {manifest['version']}.")
+
+def read_manifest(manifest_file=MANIFEST_FILE):
+    """Return the current result manifest, or None if no result has been published."""
+    try:
+        with open(manifest_file) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+def load_result(result_file=RESULT_FILE):
+    """Memory-map the canonical result and return it as a funds table, or None if missing."""
+    try:
+        table = pq.read_table(result_file, memory_map=True)
+    except FileNotFoundError:
+        return None
+    return from_storage_frame(table.to_pandas())
+
+def result_version(result_file=RESULT_FILE, manifest_file=MANIFEST_FILE):
+    """Return the published result version, or None if there is no result."""
+    manifest = read_manifest(manifest_file)
+    if manifest is not None:
+        return manifest['version']
+    # Results written before manifests existed: fall back to the file's stat.
+    try:
+        stat = os.stat(result_file)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Index report for the Student Funds Check queries.
+
+Runs EXPLAIN on every query the checks send (the per-student helpers, bulk_fetch,
+cte_fetch and streaming_check, with FILTER_DISBSTATUS_X on and off),
+with sample parameters taken from the current term. It reports each table that
+is read with a full scan (type ALL), mapping aliases back to base tables, then prints the covering-index DDL needed
+by the tables that were scanned, leaving out indexes that already exist.
+With --views it also prints per-term summary views that pre-aggregate tuition,
+scheduled funds and credits, for the DBA to consider.
+
+Usage:
+    python index_report.py [--all] [--views] [--output index_plan.sql]
+"""
+
+import argparse
+import datetime
+import logging
+import re
+
+import mysql.connector
+
+import bulk_fetch
+import cte_fetch
+from db_pool import connect_to_db
+import streaming_check
+
+# ---------------- Query Catalog ---------------- #
+
+# Per-student helper queries: (name, source, query, parameters) where parameters maps
+# the sample values to the query's %s values. app.py and susans_check.py are Streamlit
+# scripts that keep this SQL inline (async_check.py repeats app.py's), so it is
+# copied here; every set-based query comes from its module's builder (query_catalog).
+PER_STUDENT_QUERIES = [
+    ("get_term_dates", "app.py, susans_check.py", '''
+        SELECT TERMCODE, STARTDATE, ENDDATE
+        FROM `termlist`
+        WHERE (`ENDDATE` >= %s) AND (`STARTDATE` <= %s) AND ACTIVE = 1
+        LIMIT 1;
+     ''', lambda s: (s['current_date'], s['current_date'])),
+    ("get_enrollments", "app.py", '''
+        SELECT e.ID, e.STARTDATE, e.PROGRAM, e.STATUS, e.ENROLLMENTNUMBER
+        FROM enrollments e
+        JOIN (
+            SELECT ID, MAX(ENROLLMENTNUMBER) AS maxEnroll
+            FROM enrollments
+            WHERE STATUS IN ("C", "P", "W") AND TYPE = 'E'
+            GROUP BY ID
+        ) latest ON e.ID = latest.ID AND e.ENROLLMENTNUMBER = latest.maxEnroll
+        WHERE e.STATUS IN ("C", "P", "W");
+     ''', lambda s: ()),
+    ("get_enrollments", "susans_check.py", '''
+        SELECT e.ID, e.STARTDATE, e.PROGRAM, e.STATUS
+        FROM `enrollments` e
+        WHERE e.`STATUS` IN ("C", "P", "W", "X")
+          AND e.`TYPE` = 'E';
+     ''', lambda s: ()),
+    ("get_total_credits", "app.py, susans_check.py", '''
+        SELECT SUM(CREDIT) as total_credits
+        FROM `transcript`
+        WHERE `ENDDATE` >= %s
+          AND `STARTDATE` <= %s
+          AND `ID` = %s;
+     ''', lambda s: (s['term_start_date'], s['term_end_date'], s['student_id'])),
+    ("get_total_enrollment_credits", "app.py, susans_check.py", '''
+        SELECT CREDIT as total_enrollment_credits
+        FROM `enrollments`
+        WHERE `ID` = %s
+          AND `STATUS` IN ("C", "P", "W")
+          AND `TYPE` = 'E'
+        LIMIT 1;
+     ''', lambda s: (s['student_id'],)),
+    ("check_account_ledger", "app.py, susans_check.py", '''
+        SELECT SUM(TRANSACTIONAMOUNT) as tuition_amount
+        FROM `accountledger`
+        WHERE `TRANSACTIONCODE` = "Tuition"
+          AND `TRANSACTIONDATE` <= %s
+          AND `TRANSACTIONDATE` >= %s
+          AND `ID` = %s;
+     ''', lambda s: (s['term_end_date'], s['term_start_date'], s['student_id'])),
+    ("get_term_scheduled_funds", "app.py, susans_check.py", '''
+        SELECT SUM(NETAMOUNTSCHED) as term_scheduled_funds
+        FROM `disbursements`
+        WHERE `DISBSTATUS` NOT IN ("X")
+          AND `ID` = %s
+          AND `DATESCHED` >= %s
+          AND `DATESCHED` <= %s;
+     ''', lambda s: (s['student_id'], s['term_start_date'], s['term_end_date'])),
+    ("get_term_scheduled_funds", "app.py, filter off", '''
+        SELECT SUM(NETAMOUNTSCHED) as term_scheduled_funds
+        FROM `disbursements`
+        WHERE `ID` = %s
+          AND `DATESCHED` >= %s
+          AND `DATESCHED` <= %s;
+     ''', lambda s: (s['student_id'], s['term_start_date'], s['term_end_date'])),
+    ("get_latest_enrollment_number", "app.py", '''
+        SELECT MAX(ENROLLMENTNUMBER) FROM enrollments WHERE ID = %s;
+     ''', lambda s: (s['student_id'],)),
+    ("get_total_scheduled_funds", "app.py", '''
+        SELECT SUM(NETAMOUNTSCHED) as total_scheduled_funds
+        FROM disbursements
+        WHERE DISBSTATUS NOT IN ("X")
+          AND ID = %s
+          AND ENROLLMENTNUMBER = %s;
+     ''', lambda s: (s['student_id'], s['enrollment_number'])),
+    ("get_total_scheduled_funds", "app.py, filter off", '''
+        SELECT SUM(NETAMOUNTSCHED) as total_scheduled_funds
+        FROM disbursements
+        WHERE ID = %s
+          AND ENROLLMENTNUMBER = %s;
+     ''', lambda s: (s['student_id'], s['enrollment_number'])),
+    ("get_total_scheduled_funds", "susans_check.py", '''
+        SELECT SUM(NETAMOUNTSCHED) as total_scheduled_funds
+        FROM `disbursements`
+        WHERE `DISBSTATUS` NOT IN ("X")
+          AND `ID` = %s
+          AND `DATESCHED` >= %s;
+     ''', lambda s: (s['student_id'], s['enrollment_start_date'])),
+    ("get_student_name", "app.py", '''
+        SELECT FNAME, LNAME
+        FROM students
+        WHERE ID = %s;
+     ''', lambda s: (s['student_id'],)),
+]
+
+def query_catalog(samples):
+    """
+    Return (name, source, query, params) for every query the checks send, with the
+    set-based ones built by bulk_fetch, cte_fetch and streaming_check
+    for both FILTER_DISBSTATUS_X settings, filled in with the sample values.
+    """
+    start, end = samples['term_start_date'], samples['term_end_date']
+    catalog = [(name, source, query, parameters(samples)) for name, source, query, parameters in PER_STUDENT_QUERIES]
+
+    # Full-term loads, then the same statements limited to an ID list, as streaming
+    # batches run them.
+    for student_ids, scope in ((None, ""), ((samples['student_id'],), ", ID list")):
+        catalog += [
+            ("fetch_tuition_amounts", f"bulk_fetch.py{scope}",
+             *bulk_fetch.build_tuition_amounts_query(start, end, student_ids)),
+            ("fetch_term_credits", f"bulk_fetch.py{scope}",
+             *bulk_fetch.build_term_credits_query(start, end, student_ids)),
+            ("fetch_enrollment_credits", f"bulk_fetch.py{scope}",
+             *bulk_fetch.build_enrollment_credits_query(student_ids)),
+            ("fetch_student_names", f"bulk_fetch.py{scope}",
+             *bulk_fetch.build_student_names_query(student_ids)),
+        ]
+        for filter_disbstatus_x in (True, False):
+            variant = f"{scope}, filter {'on' if filter_disbstatus_x else 'off'}"
+            catalog += [
+                ("fetch_term_scheduled_funds", f"bulk_fetch.py{variant}",
+                 *bulk_fetch.build_term_scheduled_funds_query(start, end, filter_disbstatus_x, student_ids)),
+                ("fetch_total_scheduled_funds", f"bulk_fetch.py{variant}",
+                 *bulk_fetch.build_total_scheduled_funds_query(filter_disbstatus_x, student_ids)),
+            ]
+
+    for filter_disbstatus_x in (True, False):
+        catalog.append(("load_term_funds", f"cte_fetch.py, filter {'on' if filter_disbstatus_x else 'off'}",
+                        *cte_fetch.build_term_funds_query(start, end, filter_disbstatus_x)))
+    catalog += [
+        ("fetch_program_coacodes", "bulk_fetch.py", bulk_fetch.PROGRAM_COACODES_QUERY, ()),
+        ("count_enrollments", "streaming_check.py", streaming_check.COUNT_ENROLLMENTS_QUERY, ()),
+        ("iter_enrollment_batches", "streaming_check.py", streaming_check.ENROLLMENT_STREAM_QUERY, ()),
+    ]
+    return catalog
+
+# Covering indexes for the predicates above: equality columns first, then the
+# range column, then the selected value so the query never reads the base row.
+INDEX_RECOMMENDATIONS = [
+    ("accountledger", "idx_accountledger_code_id_date", ("TRANSACTIONCODE", "ID", "TRANSACTIONDATE", "TRANSACTIONAMOUNT")),
+    ("disbursements", "idx_disbursements_id_datesched", ("ID", "DATESCHED", "DISBSTATUS", "NETAMOUNTSCHED")),
+    ("disbursements", "idx_disbursements_id_enrollment", ("ID", "ENROLLMENTNUMBER", "DISBSTATUS", "NETAMOUNTSCHED")),
+    ("transcript", "idx_transcript_id_dates", ("ID", "STARTDATE", "ENDDATE", "CREDIT")),
+    ("enrollments", "idx_enrollments_status_type_id", ("STATUS", "TYPE", "ID", "ENROLLMENTNUMBER")),
+    ("enrollments", "idx_enrollments_id_enrollment", ("ID", "ENROLLMENTNUMBER")),
+    ("students", "idx_students_id", ("ID", "FNAME", "LNAME")),
+    ("programs", "idx_programs_active_code", ("ACTIVE", "PROGRAMCODE", "COACODE")),
+    ("termlist", "idx_termlist_active_dates", ("ACTIVE", "STARTDATE", "ENDDATE")),
+]
+
+# Per-term aggregates; joined with termlist they replace the per-student SUM queries.
+SUMMARY_VIEWS = [
+    '''
+CREATE OR REPLACE VIEW term_student_tuition AS
+SELECT t.TERMCODE, a.ID, SUM(a.TRANSACTIONAMOUNT) AS tuition_amount
+FROM termlist t
+JOIN accountledger a
+  ON a.TRANSACTIONCODE = 'Tuition'
+ AND a.TRANSACTIONDATE >= t.STARTDATE
+ AND a.TRANSACTIONDATE <= t.ENDDATE
+GROUP BY t.TERMCODE, a.ID;''',
+    '''
+CREATE OR REPLACE VIEW term_student_scheduled_funds AS
+SELECT t.TERMCODE, d.ID,
+       SUM(d.NETAMOUNTSCHED) AS term_scheduled_funds,
+       SUM(CASE WHEN d.DISBSTATUS <> 'X' THEN d.NETAMOUNTSCHED END) AS term_scheduled_funds_excluding_x
+FROM termlist t
+JOIN disbursements d
+  ON d.DATESCHED >= t.STARTDATE
+ AND d.DATESCHED <= t.ENDDATE
+GROUP BY t.TERMCODE, d.ID;''',
+    '''
+CREATE OR REPLACE VIEW term_student_credits AS
+SELECT t.TERMCODE, tr.ID, SUM(tr.CREDIT) AS total_credits
+FROM termlist t
+JOIN transcript tr
+  ON tr.ENDDATE >= t.STARTDATE
+ AND tr.STARTDATE <= t.ENDDATE
+GROUP BY t.TERMCODE, tr.ID;''',
+]
+
+# ---------------- Report ---------------- #
+
+def sample_parameters(db):
+    """Pick a current term and one of its students to fill in the query parameters."""
+    current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    cursor = db.cursor(buffered=True)
+    try:
+        cursor.execute(PER_STUDENT_QUERIES[0][2], (current_date, current_date))
+        term = cursor.fetchone() or (None, current_date, current_date)
+        cursor.execute(f"{bulk_fetch.TERM_STUDENTS_QUERY} LIMIT 1;")
+        student = cursor.fetchone()
+        student_id = student[0] if student else 0
+        cursor.execute(
+            "SELECT MAX(ENROLLMENTNUMBER), MAX(STARTDATE) FROM enrollments WHERE ID = %s;",
+            (student_id,)
+        )
+        enrollment_number, enrollment_start_date = cursor.fetchone() or (None, None)
+    finally:
+        cursor.close()
+    return {
+        'current_date': current_date,
+        'term_start_date': term[1],
+        'term_end_date': term[2],
+        'student_id': student_id,
+        'enrollment_number': enrollment_number or 0,
+        'enrollment_start_date': enrollment_start_date or term[1],
+    }
+
+def explain(db, query, params):
+    """Return the EXPLAIN rows for a query as dicts."""
+    cursor = db.cursor(buffered=True)
+    try:
+        cursor.execute(f"EXPLAIN {query.strip()}", params)
+        columns = cursor.column_names
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def existing_indexes(db, table):
+    """Return the column tuples of the indexes already defined on a table."""
+    cursor = db.cursor(buffered=True)
+    try:
+        cursor.execute(f"SHOW INDEX FROM `{table}`;")
+        columns = cursor.column_names
+        indexes = {}
+        for row in cursor.fetchall():
+            entry = dict(zip(columns, row))
+            indexes.setdefault(entry['Key_name'], []).append((entry['Seq_in_index'], entry['Column_name']))
+        return [tuple(name.upper() for _, name in sorted(parts)) for parts in indexes.values()]
+    except mysql.connector.Error as e:
+        logging.error(f"Error reading indexes for {table}: {e}")
+        return []
+    finally:
+        cursor.close()
+
+# A table read in FROM or JOIN, with its optional alias; EXPLAIN names the table by its alias.
+TABLE_REFERENCE = re.compile(
+    r"\b(?:FROM|JOIN)\s+(?:`?\w+`?\.)?`?(\w+)`?"
+    r"(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|RIGHT|INNER|CROSS|GROUP|ORDER|LIMIT|USING|UNION|HAVING)\b)(\w+))?",
+    re.IGNORECASE,
+)
+# A common table expression's name, which is not a base table.
+CTE_NAME = re.compile(r"(?:\bWITH|,)\s*(\w+)\s+AS\s*\(", re.IGNORECASE)
+
+def base_tables(query):
+    """Return {name or alias as EXPLAIN shows it: base table} for the base tables a query reads."""
+    ctes = {name.lower() for name in CTE_NAME.findall(query)}
+    tables = {}
+    for table, alias in TABLE_REFERENCE.findall(query):
+        table = table.lower()
+        if table in ctes:
+            continue
+        tables[table] = table
+        if alias:
+            tables[alias.lower()] = table
+    return tables
+
+def scan_queries(db, samples):
+    """EXPLAIN every catalog query; return (report lines, tables read with a full scan)."""
+    lines = []
+    scanned_tables = set()
+    for name, source, query, params in query_catalog(samples):
+        try:
+            plan = explain(db, query, params)
+        except mysql.connector.Error as e:
+            lines.append(f"{name} ({source}): EXPLAIN failed: {e}")
+            continue
+        tables = base_tables(query)
+        for step in plan:
+            # Aliased tables are mapped back to their base table; CTEs and derived tables are not
+            table = step.get('table')
+            if table:
+                table = tables.get(table.lower(), table)
+            access = step.get('type')
+            flag = "FULL SCAN" if access == 'ALL' else "ok"
+            if access == 'ALL' and table in tables.values():
+                scanned_tables.add(table)
+            lines.append(
+                f"{name:<30} {source:<40} {str(table):<15} type={str(access):<7} "
+                f"key={str(step.get('key')):<30} rows={step.get('rows')}  {flag}"
+            )
+    return lines, scanned_tables
+
+def index_ddl(db, tables=None):
+    """Return CREATE INDEX statements for the recommended indexes that do not exist yet."""
+    statements = []
+    present = {}
+    for table, index_name, columns in INDEX_RECOMMENDATIONS:
+        if tables is not None and table not in tables:
+            continue
+        if table not in present:
+            present[table] = existing_indexes(db, table)
+        wanted = tuple(column.upper() for column in columns)
+        if any(index[:len(wanted)] == wanted for index in present[table]):
+            continue
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        statements.append(f"CREATE INDEX `{index_name}` ON `{table}` ({column_list});")
+    return statements
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the funds check queries and suggest indexes.")
+    parser.add_argument("--all", action="store_true",
+                        help="suggest every missing index, not only those for full-scanned tables")
+    parser.add_argument("--views", action="store_true",
+                        help="also print the per-term summary views")
+    parser.add_argument("--output", help="write the DDL to this file as well")
+    args = parser.parse_args()
+
+    db = connect_to_db()
+    if not db:
+        raise SystemExit("Could not connect to the database.")
+    try:
+        samples = sample_parameters(db)
+        lines, scanned_tables = scan_queries(db, samples)
+        ddl = index_ddl(db, None if args.all else scanned_tables)
+    finally:
+        db.close()
+
+    print("Query plans:")
+    for line in lines:
+        print(f"  {line}")
+    print(f"\nTables read with a full scan: {', '.join(sorted(scanned_tables)) or 'none'}")
+
+    if args.views:
+        ddl += SUMMARY_VIEWS
+    print("\n-- Recommended DDL")
+    print("\n".join(ddl) if ddl else "-- nothing to add")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write("\n".join(ddl) + "\n")
+        print(f"\nDDL written to {args.output}")
+
+if __name__ == '__main__':
+    main()
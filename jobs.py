@@ -0,0 +1,249 @@
+"""
+Background jobs for long funds checks.
+
+A check is submitted under a kind ("funds_check", "csv_check") and a key (for
+example the current date and filter setting). If an identical job is already
+queued or running, its ID is returned instead of starting another run. Jobs run
+on a small thread pool that outlives any single Streamlit rerun or Flask request,
+so a closed browser tab does not stop the check.
+
+Job state lives in a SQLite table (JOB_DB) so both front ends, even in separate
+processes, can poll progress by job ID and download the finished artifact.
+Running jobs refresh a heartbeat; a queued or running job whose heartbeat is
+older than JOB_STALE_SECONDS (e.g. its process died) no longer blocks a resubmit.
+Each submit also removes the kind's jobs that finished (or went stale) more than
+JOB_RETENTION_SECONDS ago, with their artifact files when every job writes its own.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from progress import ProgressReporter
+
+JOB_DB = os.getenv('JOB_DB', 'student_funds_jobs.sqlite3')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', 15))
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', 120))
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', 24 * 60 * 60))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    job_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    artifact TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    heartbeat REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_kind_key ON jobs (kind, job_key, status);
+"""
+
+_lock = threading.Lock()
+_executor = None
+_heartbeat_thread = None
+_running = set()
+_schema_ready = False
+
+# ---------------- Job Table ---------------- #
+
+def _connect():
+    """Open the job table, creating it on first use."""
+    global _schema_ready
+    conn = sqlite3.connect(JOB_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        conn.executescript(SCHEMA)
+        _schema_ready = True
+    return conn
+
+def _update(job_id, **fields):
+    """Set columns on a job row and refresh its heartbeat."""
+    fields['heartbeat'] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    conn = _connect()
+    try:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+    finally:
+        conn.close()
+
+def _make_key(key):
+    """Serialize a job key (a tuple of simple values) for storage and comparison."""
+    return json.dumps(list(key), default=str)
+
+def get_job(job_id):
+    """Return the job row as a dict, or None if there is no such job."""
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+def find_active_job(kind, key):
+    """Return the ID of a live queued or running job for (kind, key), or None."""
+    conn = _connect()
+    try:
+        return _find_active_job(conn, kind, _make_key(key))
+    finally:
+        conn.close()
+
+def _find_active_job(conn, kind, job_key):
+    row = conn.execute(
+        """
+        SELECT id FROM jobs
+        WHERE kind = ? AND job_key = ? AND status IN (?, ?) AND heartbeat >= ?
+        ORDER BY created DESC
+        LIMIT 1
+        """,
+        (kind, job_key, *ACTIVE_STATUSES, time.time() - JOB_STALE_SECONDS)
+    ).fetchone()
+    return row['id'] if row else None
+
+def prune_jobs(kind, owns_artifacts=False):
+    """
+    Delete the `kind` jobs that finished, or stopped sending heartbeats, more than
+    JOB_RETENTION_SECONDS ago. With `owns_artifacts`, their artifact files are
+    deleted too. Returns the number of jobs removed.
+    """
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            """
+            SELECT id, artifact FROM jobs
+            WHERE kind = ? AND (finished < ? OR (status IN (?, ?) AND heartbeat < ?))
+            """,
+            (kind, cutoff, *ACTIVE_STATUSES, cutoff)
+        ).fetchall()
+        removed = 0
+        for row in rows:
+            if owns_artifacts and row['artifact']:
+                try:
+                    os.remove(row['artifact'])
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    # Keep the row so the file is retried on the next sweep
+                    logging.error(f"Error removing artifact of job {row['id']}: {e}")
+                    continue
+            conn.execute("DELETE FROM jobs WHERE id = ?", (row['id'],))
+            removed += 1
+    finally:
+        conn.close()
+    if removed:
+        logging.info(f"Removed {removed} expired {kind} jobs.")
+    return removed
+
+# ---------------- Running Jobs ---------------- #
+
+class JobProgressReporter(ProgressReporter):
+    """Reporter that stores progress on the job row (throttled like the others)."""
+
+    def __init__(self, job_id, **kwargs):
+        super().__init__(**kwargs)
+        self.job_id = job_id
+
+    def render(self, processed, percent):
+        _update(self.job_id, processed=processed, total=self.total)
+
+def _get_executor():
+    """Create the shared job pool and heartbeat thread on first use."""
+    global _executor, _heartbeat_thread
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="funds_job")
+            _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="funds_job_heartbeat", daemon=True)
+            _heartbeat_thread.start()
+        return _executor
+
+def _heartbeat_loop():
+    """Keep the heartbeat of this process's jobs fresh between progress updates."""
+    while True:
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+        with _lock:
+            job_ids = list(_running)
+        for job_id in job_ids:
+            try:
+                _update(job_id)
+            except sqlite3.Error as e:
+                logging.error(f"Error updating heartbeat for job {job_id}: {e}")
+
+def _run_job(job_id, func):
+    """Run a job function and record its outcome."""
+    with _lock:
+        _running.add(job_id)
+    try:
+        _update(job_id, status=RUNNING)
+        logging.info(f"Job {job_id} started.")
+        artifact = func(JobProgressReporter(job_id))
+        if artifact is None:
+            _update(job_id, status=FAILED, error="The check did not produce a result. See the log for details.",
+                    finished=time.time())
+            logging.warning(f"Job {job_id} finished without a result.")
+        else:
+            _update(job_id, status=DONE, artifact=os.path.abspath(artifact), finished=time.time())
+            logging.info(f"Job {job_id} finished: {artifact}")
+    except Exception as e:
+        logging.error(f"Job {job_id} failed: {e}")
+        _update(job_id, status=FAILED, error=str(e), finished=time.time())
+    finally:
+        with _lock:
+            _running.discard(job_id)
+
+def submit(kind, key, func, owns_artifacts=False):
+    """
+    Start `func(reporter)` in the background and return its job ID. `func` returns
+    the path of the finished artifact, or None on failure. An identical job that is
+    still in flight is reused instead. Pass `owns_artifacts` when each job writes a
+    file of its own, so expired jobs take their files with them (see prune_jobs).
+    """
+    try:
+        prune_jobs(kind, owns_artifacts)
+    except sqlite3.Error as e:
+        logging.error(f"Error pruning {kind} jobs: {e}")
+
+    job_key = _make_key(key)
+    conn = _connect()
+    try:
+        # BEGIN IMMEDIATE takes the write lock, so two submitters cannot both insert.
+        conn.execute("BEGIN IMMEDIATE")
+        job_id = _find_active_job(conn, kind, job_key)
+        if job_id:
+            conn.execute("COMMIT")
+            logging.info(f"Reusing in-flight job {job_id} for {kind} {job_key}.")
+            return job_id
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn.execute(
+            "INSERT INTO jobs (id, kind, job_key, status, created, heartbeat) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, job_key, QUEUED, now, now)
+        )
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        # BEGIN IMMEDIATE itself may have failed (database locked), leaving nothing to roll back
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    logging.info(f"Submitted job {job_id} for {kind} {job_key}.")
+    _get_executor().submit(_run_job, job_id, func)
+    return job_id
@@ -4,12 +4,25 @@ Local runner: this script calls the run_check() function from app.py
 to execute the Student Funds Check and generate CSV files without using Streamlit.
 """
 
-from app import run_check
+import argparse
+
+import query_stats
+from app import CHECK_MODES, run_check
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the Student Funds Check without Streamlit.")
+    parser.add_argument("--mode", choices=CHECK_MODES, default="bulk",
+                        help="how student data is fetched (default: bulk)")
+    parser.add_argument("--workers", type=int,
+                        help="worker threads for the parallel mode")
+    args = parser.parse_args()
+
     print("Running Student Funds Check...")
-    run_check()
+    run_check(mode=args.mode, workers=args.workers)
     print("Check completed! CSV files generated.")
+    last_run = query_stats.last_run("app.run_check")
+    if last_run is not None:
+        print(last_run.format_table())
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
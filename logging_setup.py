@@ -0,0 +1,127 @@
+"""
+Logging configuration for the funds checks.
+
+configure() installs one QueueHandler on the root logger; a QueueListener thread
+formats the records and writes them to a RotatingFileHandler and stderr, so a
+check's hot loop does no file or terminal I/O. The QueueHandler renders each
+message before queueing it, so arguments that are changed after the call (lists,
+dicts, DataFrames) are logged as they were. %-style calls
+(logging.debug("... %s", value)) below the configured level are never built.
+
+Repeated messages are rate-limited by template: after LOG_REPEAT_LIMIT records
+with the same message template within LOG_REPEAT_WINDOW seconds, further ones
+(below ERROR) are dropped and counted, and one line reporting how many were
+suppressed is logged when the window rolls over (or at shutdown).
+
+configure() is idempotent, so Streamlit reruns of app.py keep one listener.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+LOG_FILE = os.getenv('LOG_FILE', "student_funds.log")
+LOG_LEVEL = os.getenv('LOG_LEVEL', "INFO").upper()
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# The log file is rotated at LOG_MAX_BYTES, keeping LOG_BACKUP_COUNT old files.
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+
+# Records with the same message template allowed per window before the rest are suppressed.
+LOG_REPEAT_LIMIT = int(os.getenv('LOG_REPEAT_LIMIT', 20))
+LOG_REPEAT_WINDOW = float(os.getenv('LOG_REPEAT_WINDOW', 60))
+
+class RepeatFilter(logging.Filter):
+    """Drop records below ERROR once their message template repeats too often within a window."""
+
+    def __init__(self, limit=LOG_REPEAT_LIMIT, window=LOG_REPEAT_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._counts = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.msg)
+        ended_window = None
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window:
+                ended_window = self._counts
+                self._window_start = now
+                self._counts = {}
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        if ended_window:
+            self._report_suppressed(ended_window)
+        return count <= self.limit
+
+    def flush(self):
+        """Report what the current window has suppressed so far and start a new window."""
+        with self._lock:
+            counts = self._counts
+            self._window_start = time.monotonic()
+            self._counts = {}
+        self._report_suppressed(counts)
+
+    def _report_suppressed(self, counts):
+        """Log how many records of each template were dropped in a window that has ended."""
+        for (name, msg), count in counts.items():
+            if count > self.limit:
+                logging.getLogger(name).warning(
+                    "Suppressed %d more log messages like %r in the last %.0f seconds.",
+                    count - self.limit, msg, self.window,
+                )
+
+_listener = None
+_queue_handler = None
+_configure_lock = threading.Lock()
+
+def configure(log_file=LOG_FILE, level=LOG_LEVEL):
+    """Route the root logger through a background writer to a rotating file and stderr."""
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is not None:
+            return
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+        )
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _queue_handler.addFilter(RepeatFilter())
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+        _listener.start()
+        atexit.register(shutdown)
+
+def shutdown():
+    """Flush queued records and stop the background writer."""
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is None:
+            return
+        for log_filter in _queue_handler.filters:
+            log_filter.flush()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
@@ -0,0 +1,75 @@
+"""
+Program price lookup for the funds checks.
+
+Every student in a program pays the same price per credit (the program's
+COACODE), so the active programs are loaded with one query per run and each
+COACODE is parsed once. Lookups are plain dict reads. Programs whose price falls
+back to 0.0 (no active COACODE, empty or not a number) are collected while the
+run looks them up and reported in one summary at the end, instead of one log
+line per student.
+"""
+
+import logging
+
+from bulk_fetch import fetch_program_coacodes
+
+NO_COACODE = "no active COACODE"
+EMPTY_COACODE = "empty COACODE"
+INVALID_COACODE = "invalid COACODE"
+
+def parse_coacode(coacode):
+    """Return (price per credit, problem) for a raw COACODE; problem is None when it parses."""
+    if coacode is None:
+        return 0.0, NO_COACODE
+    coacode_str = str(coacode).strip()
+    if coacode_str == '':
+        return 0.0, EMPTY_COACODE
+    try:
+        return float(coacode_str), None
+    except ValueError:
+        return 0.0, f"{INVALID_COACODE} '{coacode_str}'"
+
+class ProgramPriceIndex:
+    """Price per credit for every active program, parsed once."""
+
+    def __init__(self, coacodes):
+        self._prices = {}
+        self._problems = {}
+        for program_code, coacode in coacodes.items():
+            self._prices[program_code], problem = parse_coacode(coacode)
+            if problem:
+                self._problems[program_code] = problem
+        self._used_problems = set()
+
+    def __len__(self):
+        return len(self._prices)
+
+    def price(self, program_code):
+        """Return the price per credit for a program (0.0 if it has no usable COACODE)."""
+        price = self._prices.get(program_code)
+        if price is None:
+            self._used_problems.add(program_code)
+            return 0.0
+        if program_code in self._problems:
+            self._used_problems.add(program_code)
+        return price
+
+    def problems(self):
+        """Return {program_code: problem} for the programs looked up so far that fell back to 0.0."""
+        return {
+            program_code: self._problems.get(program_code, NO_COACODE)
+            for program_code in sorted(self._used_problems, key=str)
+        }
+
+    def log_summary(self):
+        """Log a single line naming every looked-up program priced at 0.0, and why."""
+        problems = self.problems()
+        if problems:
+            details = ", ".join(f"{program_code} ({problem})" for program_code, problem in problems.items())
+            logging.warning(f"Price per Credit set to 0.0 for {len(problems)} program(s): {details}.")
+
+def load_price_index(db):
+    """Load and parse the active programs' COACODEs with a single query."""
+    index = ProgramPriceIndex(fetch_program_coacodes(db))
+    logging.info(f"Program price index loaded with {len(index)} programs.")
+    return index
@@ -0,0 +1,85 @@
+"""
+Throttled progress reporting for the funds checks.
+
+A reporter is told about every processed record but only renders when enough
+time has passed or the percentage has moved far enough, so long runs do not
+push one UI update (or print) per student. None of the reporters ever sleep.
+"""
+
+import time
+
+# Render at most this often (seconds) unless the percentage jumps by MIN_PERCENT.
+MIN_INTERVAL = 0.25
+MIN_PERCENT = 5
+
+class ProgressReporter:
+    """Base reporter: tracks and throttles progress, renders nothing."""
+
+    def __init__(self, min_interval=MIN_INTERVAL, min_percent=MIN_PERCENT):
+        self.min_interval = min_interval
+        self.min_percent = min_percent
+        self.total = 0
+        self.renders = 0
+        self._last_time = None
+        self._last_percent = None
+
+    def start(self, total):
+        """Reset the reporter for a run of `total` records."""
+        self.total = total
+        self.renders = 0
+        self._last_time = None
+        self._last_percent = None
+
+    def update(self, processed):
+        """Record progress and render it if the throttle allows."""
+        percent = int((processed / self.total) * 100) if self.total else 100
+        now = time.monotonic()
+        if (
+            self._last_time is None
+            or processed >= self.total
+            or now - self._last_time >= self.min_interval
+            or percent - self._last_percent >= self.min_percent
+        ):
+            self._last_time = now
+            self._last_percent = percent
+            self.renders += 1
+            self.render(processed, percent)
+
+    def finish(self):
+        """Render the final state, even if the last update was throttled."""
+        if self._last_percent != 100:
+            self.renders += 1
+            self.render(self.total, 100)
+
+    def render(self, processed, percent):
+        """Display progress; subclasses override this."""
+
+class StreamlitProgressReporter(ProgressReporter):
+    """Reporter that drives a Streamlit text line and progress bar."""
+
+    def start(self, total):
+        import streamlit as st
+
+        super().start(total)
+        self._text = st.empty()
+        self._bar = st.progress(0)
+
+    def render(self, processed, percent):
+        self._text.text(f"Processing record {processed} of {self.total}. Please wait.")
+        self._bar.progress(percent)
+
+class PrintProgressReporter(ProgressReporter):
+    """Reporter that prints progress lines to stdout."""
+
+    def render(self, processed, percent):
+        print(f"Processing record {processed} of {self.total} ({percent}%)")
+
+def make_reporter():
+    """Return a Streamlit reporter inside a Streamlit app run, otherwise a no-op one."""
+    try:
+        from streamlit import runtime
+    except ImportError:
+        return ProgressReporter()
+    if runtime.exists():
+        return StreamlitProgressReporter()
+    return ProgressReporter()
@@ -0,0 +1,253 @@
+"""
+Query-level instrumentation for the funds checks.
+
+instrument() wraps a database connection so that every cursor execution is
+timed and attributed to the function that issued it (the helper's name, e.g.
+check_account_ledger; shared runners such as bulk_fetch._fetch_grouped are
+skipped over). Each run_check collects into one RunStats: call counts, rows
+returned and a latency histogram per query name. Executions slower than
+SLOW_QUERY_MS are logged with their parameters as they happen, and the summary
+table is logged when the run finishes and kept for the UI (last_run).
+
+The run being collected is tracked per thread; code that hands work to other
+threads passes current() along explicitly.
+"""
+
+import bisect
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+
+# Executions at or above this many milliseconds are logged with their parameters.
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Functions that run queries on behalf of their caller; the caller's name is used instead.
+QUERY_HELPERS = {"_fetch_grouped", "_fetch_one"}
+
+# Longest parameter text written to the slow-query log.
+MAX_PARAMS_LOGGED = 300
+
+def query_name(depth=2):
+    """Return the name of the function that issued the query, skipping this module and QUERY_HELPERS."""
+    frame = sys._getframe(depth)
+    while frame is not None and (frame.f_code.co_name in QUERY_HELPERS or frame.f_globals.get('__name__') == __name__):
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else "<unknown>"
+
+class QueryStat:
+    """Counters and latency histogram for one query name."""
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.slow = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        if elapsed_ms >= SLOW_QUERY_MS:
+            self.slow += 1
+
+    def percentile(self, fraction):
+        """Return the upper bound of the bucket holding the given fraction of calls (max_ms for the last one)."""
+        target = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+class RunStats:
+    """Per-query statistics for one check run; safe to share between threads."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed_ms, query, params):
+        """Count one execution and log it if it was slow."""
+        with self._lock:
+            self._stats.setdefault(name, QueryStat()).add(elapsed_ms)
+        if elapsed_ms >= SLOW_QUERY_MS:
+            params_text = repr(params)
+            if len(params_text) > MAX_PARAMS_LOGGED:
+                params_text = params_text[:MAX_PARAMS_LOGGED] + "..."
+            logging.warning(f"Slow query {name} took {elapsed_ms:.0f} ms with parameters {params_text}: {' '.join(query.split())[:MAX_PARAMS_LOGGED]}")
+
+    def add_rows(self, name, rows):
+        """Count rows fetched for a query name."""
+        with self._lock:
+            self._stats.setdefault(name, QueryStat()).rows += rows
+
+    def summary(self):
+        """Return one dict per query name, slowest total first."""
+        with self._lock:
+            items = list(self._stats.items())
+        rows = []
+        for name, stat in sorted(items, key=lambda item: item[1].total_ms, reverse=True):
+            rows.append({
+                'query': name,
+                'calls': stat.calls,
+                'rows': stat.rows,
+                'total_ms': round(stat.total_ms, 1),
+                'mean_ms': round(stat.total_ms / stat.calls, 2) if stat.calls else 0.0,
+                'p50_ms': round(stat.percentile(0.5), 2),
+                'p95_ms': round(stat.percentile(0.95), 2),
+                'max_ms': round(stat.max_ms, 2),
+                'slow': stat.slow,
+            })
+        return rows
+
+    def format_table(self):
+        """Return the summary as an aligned text table."""
+        lines = [f"{'query':<32}{'calls':>8}{'rows':>9}{'total ms':>11}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'slow':>6}"]
+        for row in self.summary():
+            lines.append(
+                f"{row['query']:<32}{row['calls']:>8}{row['rows']:>9}{row['total_ms']:>11.1f}{row['mean_ms']:>9.2f}"
+                f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['max_ms']:>9.2f}{row['slow']:>6}"
+            )
+        return "\n".join(lines)
+
+# ---------------- Runs ---------------- #
+
+_local = threading.local()
+_last_runs = {}
+_last_runs_lock = threading.Lock()
+
+def current():
+    """Return the RunStats being collected on this thread, or None."""
+    return getattr(_local, 'run', None)
+
+@contextlib.contextmanager
+def collect(name):
+    """Collect query statistics for the enclosed run, then log the summary and keep it as the last `name` run."""
+    stats = RunStats(name)
+    previous = current()
+    _local.run = stats
+    try:
+        yield stats
+    finally:
+        _local.run = previous
+        stats.elapsed = time.perf_counter() - stats.started
+        with _last_runs_lock:
+            _last_runs[name] = stats
+        logging.info(f"Query summary for {name} ({stats.elapsed:.2f}s):\n{stats.format_table()}")
+
+def last_run(name):
+    """Return the RunStats of the last finished `name` run, or None."""
+    with _last_runs_lock:
+        return _last_runs.get(name)
+
+# ---------------- Connection Wrappers ---------------- #
+
+class InstrumentedCursor:
+    """Cursor wrapper that times executions and counts fetched rows."""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._name = None
+
+    def execute(self, query, *args, **kwargs):
+        self._name = query_name()
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(query, *args, **kwargs)
+        finally:
+            params = args[0] if args else kwargs.get('params')
+            self._stats.record(self._name, (time.perf_counter() - start) * 1000, query, params)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.add_rows(self._name, 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.add_rows(self._name, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.add_rows(self._name, len(rows))
+        return rows
+
+    def __getattr__(self, attr):
+        return getattr(self._cursor, attr)
+
+class InstrumentedConnection:
+    """Connection wrapper whose cursors are instrumented; everything else passes through."""
+
+    def __init__(self, connection, stats):
+        self._connection = connection
+        self._stats = stats
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._stats)
+
+    def __getattr__(self, attr):
+        return getattr(self._connection, attr)
+
+class AsyncInstrumentedCursor(InstrumentedCursor):
+    """InstrumentedCursor for mysql.connector.aio cursors."""
+
+    async def execute(self, query, *args, **kwargs):
+        self._name = query_name()
+        start = time.perf_counter()
+        try:
+            return await self._cursor.execute(query, *args, **kwargs)
+        finally:
+            params = args[0] if args else kwargs.get('params')
+            self._stats.record(self._name, (time.perf_counter() - start) * 1000, query, params)
+
+    async def fetchone(self):
+        row = await self._cursor.fetchone()
+        if row is not None:
+            self._stats.add_rows(self._name, 1)
+        return row
+
+    async def fetchmany(self, *args, **kwargs):
+        rows = await self._cursor.fetchmany(*args, **kwargs)
+        self._stats.add_rows(self._name, len(rows))
+        return rows
+
+    async def fetchall(self):
+        rows = await self._cursor.fetchall()
+        self._stats.add_rows(self._name, len(rows))
+        return rows
+
+class AsyncInstrumentedConnection(InstrumentedConnection):
+    """InstrumentedConnection for mysql.connector.aio connections."""
+
+    async def cursor(self, *args, **kwargs):
+        return AsyncInstrumentedCursor(await self._connection.cursor(*args, **kwargs), self._stats)
+
+def instrument(connection, stats=None):
+    """Wrap `connection` to record into `stats` (default: this thread's run); returned as-is when there is no run."""
+    stats = stats or current()
+    if connection is None or stats is None:
+        return connection
+    return InstrumentedConnection(connection, stats)
+
+def instrument_async(connection, stats=None):
+    """instrument() for an asyncio connection."""
+    stats = stats or current()
+    if connection is None or stats is None:
+        return connection
+    return AsyncInstrumentedConnection(connection, stats)
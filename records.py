@@ -0,0 +1,30 @@
+"""
+Compact record types for the funds checks.
+
+Enrollments used to be one dict per row and the per-student funds another dict.
+These namedtuples keep their fields in the tuple itself (no per-instance
+__dict__), so a record costs a fraction of the dict it replaces. Fields read as
+attributes (enrollment.student_id), and the records still index and unpack.
+
+Output rows (funds_math.input_row, susans_check's CSV rows) stay plain tuples:
+they are built once per student and only indexed, where a namedtuple costs more
+to construct and saves almost nothing over an exact-size tuple.
+"""
+
+from collections import namedtuple
+
+# One enrollment as selected by the get_enrollments queries. susans_check and the
+# CSV blueprints do not select the enrollment number, so it defaults to None.
+Enrollment = namedtuple(
+    'Enrollment',
+    ['student_id', 'start_date', 'program', 'status', 'enrollment_number'],
+    defaults=(None,)
+)
+
+# The raw funds inputs fetched for one enrollment (app.fetch_student_funds and its
+# bulk, async and cte counterparts).
+StudentFunds = namedtuple(
+    'StudentFunds',
+    ['tuition_amount', 'term_scheduled_funds', 'total_scheduled_funds', 'total_credits',
+     'total_enrollment_credits', 'price_per_credit', 'first_name', 'last_name']
+)
@@ -0,0 +1,46 @@
+"""
+In-process cache of computed funds tables for run_check.
+
+Entries are keyed by term code, the FILTER_DISBSTATUS_X setting and the run
+date, expire after RESULT_CACHE_TTL seconds and are evicted least-recently-used
+once RESULT_CACHE_SIZE tables are held.
+"""
+
+import logging
+import os
+import threading
+
+from cachetools import TTLCache
+
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 900))
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 4))
+
+_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+_lock = threading.Lock()
+
+def make_key(term_code, filter_disbstatus_x, run_date):
+    """Build the cache key for one term, filter setting and run date."""
+    return (term_code, bool(filter_disbstatus_x), run_date)
+
+def get(key):
+    """Return the cached funds table for `key`, or None if missing or expired."""
+    with _lock:
+        return _cache.get(key)
+
+def put(key, funds_df):
+    """Store a computed funds table; callers must treat it as read-only."""
+    with _lock:
+        _cache[key] = funds_df
+
+def invalidate(term_code=None):
+    """Drop cached tables for one term, or every term when term_code is None."""
+    with _lock:
+        if term_code is None:
+            dropped = len(_cache)
+            _cache.clear()
+        else:
+            keys = [key for key in list(_cache.keys()) if key[0] == term_code]
+            for key in keys:
+                _cache.pop(key, None)
+            dropped = len(keys)
+    logging.info(f"Invalidated {dropped} cached funds table(s).")
@@ -0,0 +1,69 @@
+"""
+Single-flight coalescing for the check entry points.
+
+When several callers ask for the same check at once (staff pressing Run Check
+together at the start of the day), only the first one runs it; the others wait
+and share its result, or its exception. Calls are grouped by name, and within
+a group by a key such as (current date, filter setting). Nothing is kept once
+the call finishes, so the next call after that runs again.
+"""
+
+import logging
+import threading
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+class _Call:
+    """One in-flight call and its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class Group:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless a call with the same key is in flight; then wait for its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            logging.info(f"Waiting on in-flight {self.name} for {key}.")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logging.info(f"{self.name} for {key} shared with {call.waiters} waiting caller(s).")
+
+def group(name):
+    """Return the named group, creating it on first use."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = Group(name)
+        return _groups[name]
@@ -0,0 +1,138 @@
+"""
+Streaming pipeline for the Student Funds Check ("streaming" mode).
+
+The other modes load every enrollment, sort it in Python and hold the whole
+funds table before anything is written. Here batches of STREAM_BATCH_SIZE
+enrollments flow through generator stages:
+
+  read     the latest enrollments, ordered by ID in SQL, from an unbuffered
+           cursor in fetchmany batches, on a second pooled connection (an
+           unbuffered result ties up its connection until it is drained)
+  enrich   one set of bulk_fetch grouped queries per batch, restricted to the
+           batch's student IDs
+  compute  funds_math.compute_funds on the batch
+  write    funds_store.save_result_stream appends the batch to the Parquet
+           result and both CSVs, flushing as it goes
+
+Only one batch is held at a time, plus the program price index and the
+duplicate writer's current student, so peak memory does not grow with the
+number of students. The outputs are still published atomically, with a
+manifest, after the last batch.
+"""
+
+import logging
+import os
+
+import mysql.connector
+import pandas as pd
+
+import bulk_fetch
+from db_pool import connect_to_db
+import funds_math
+import funds_store
+import program_prices
+import query_stats
+from records import Enrollment
+
+# Enrollments read from the server-side cursor, and enriched, per batch.
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 1000))
+
+# FROM and WHERE of app.get_enrollments' query.
+LATEST_ENROLLMENTS_QUERY = """
+    FROM enrollments e
+    JOIN (
+        SELECT ID, MAX(ENROLLMENTNUMBER) AS maxEnroll
+        FROM enrollments
+        WHERE STATUS IN ("C", "P", "W") AND TYPE = 'E'
+        GROUP BY ID
+    ) latest ON e.ID = latest.ID AND e.ENROLLMENTNUMBER = latest.maxEnroll
+    WHERE e.STATUS IN ("C", "P", "W")
+"""
+
+COUNT_ENROLLMENTS_QUERY = f"SELECT COUNT(*) {LATEST_ENROLLMENTS_QUERY};"
+
+# The enrollment stream, ordered by student ID so it needs no sort.
+ENROLLMENT_STREAM_QUERY = f"""
+    SELECT e.ID, e.STARTDATE, e.PROGRAM, e.STATUS, e.ENROLLMENTNUMBER
+    {LATEST_ENROLLMENTS_QUERY}
+    ORDER BY e.ID;
+"""
+
+# ---------------- Stages ---------------- #
+
+def count_enrollments(db):
+    """Return how many enrollments the stream will produce, for progress reporting."""
+    cursor = db.cursor(buffered=True)
+    try:
+        cursor.execute(COUNT_ENROLLMENTS_QUERY)
+        result = cursor.fetchone()
+        return result[0] if result else 0
+    except mysql.connector.Error as e:
+        logging.error(f"Error in count_enrollments: {e}")
+        return 0
+    finally:
+        cursor.close()
+
+def iter_enrollment_batches(db, batch_size=STREAM_BATCH_SIZE):
+    """Yield lists of Enrollment records ordered by student ID, read in fetchmany batches."""
+    cursor = db.cursor()
+    exhausted = False
+    try:
+        cursor.execute(ENROLLMENT_STREAM_QUERY)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                exhausted = True
+                break
+            yield list(map(Enrollment._make, rows))
+    finally:
+        if not exhausted:
+            # A later stage failed mid-stream: drain the result so the connection can be reused.
+            db.consume_results()
+        cursor.close()
+
+def enrich_batches(batches, db, term_start_date, term_end_date, filter_disbstatus_x, prices):
+    """For each batch, load its students' aggregates and yield (enrollments, StudentFunds list)."""
+    for enrollments in batches:
+        student_ids = {enrollment.student_id for enrollment in enrollments}
+        term_data = bulk_fetch.load_term_data(db, term_start_date, term_end_date, filter_disbstatus_x, student_ids)
+        yield enrollments, [bulk_fetch.lookup_student_funds(term_data, enrollment, prices) for enrollment in enrollments]
+
+def compute_batches(enriched, term_code, reporter):
+    """Yield the computed funds table for each enriched batch, reporting progress."""
+    processed_count = 0
+    for enrollments, student_funds in enriched:
+        raw_rows = [funds_math.input_row(enrollment, funds, term_code)
+                    for enrollment, funds in zip(enrollments, student_funds)]
+        yield funds_math.compute_funds(pd.DataFrame(raw_rows, columns=funds_math.INPUT_COLUMNS))
+        processed_count += len(raw_rows)
+        reporter.update(processed_count)
+
+# ---------------- Pipeline ---------------- #
+
+def run_streaming_check(db, term_code, term_start_date, term_end_date, filter_disbstatus_x, reporter,
+                        batch_size=None):
+    """
+    Stream the funds table for the term into the published outputs and return the
+    manifest, or None if no second connection was available. `db` runs the
+    enrichment queries; the enrollment stream gets a connection of its own.
+    """
+    stream_db = query_stats.instrument(connect_to_db())
+    if stream_db is None:
+        logging.error("Could not get a database connection for the enrollment stream.")
+        return None
+    try:
+        prices = program_prices.load_price_index(db)
+        reporter.start(count_enrollments(db))
+        batches = iter_enrollment_batches(stream_db, batch_size or STREAM_BATCH_SIZE)
+        enriched = enrich_batches(batches, db, term_start_date, term_end_date, filter_disbstatus_x, prices)
+        try:
+            manifest = funds_store.save_result_stream(compute_batches(enriched, term_code, reporter), term_code=term_code)
+        finally:
+            # Close the generators now, so the stream is drained before its connection goes back to the pool.
+            batches.close()
+        reporter.finish()
+        prices.log_summary()
+        return manifest
+    finally:
+        stream_db.close()
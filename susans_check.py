@@ -3,36 +3,20 @@ import mysql.connector
 from datetime import datetime
 import csv
 import logging
-import os
-from collections import defaultdict
 import pandas as pd
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,  # Change to DEBUG for more detailed logs
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("student_funds.log"),
-        logging.StreamHandler()
-    ]
-)
-
-# Database connection function
-def connect_to_db():
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'campuscloud-public.mdb0002003.db.skysql.net'),
-            user=os.getenv('DB_USER', 'russell'),
-            password=os.getenv('DB_PASSWORD', 'Ab4W034#72ecqe'),
-            database=os.getenv('DB_NAME', 'mediatechcloud_sdb'),
-            port=int(os.getenv('DB_PORT', 5002))
-        )
-        if connection.is_connected():
-            logging.info("Successfully connected to the database.")
-        return connection
-    except mysql.connector.Error as e:
-        logging.error(f"Error connecting to database: {e}")
-        return None
+from db_pool import connect_to_db
+from duplicates import DuplicateWriter
+from funds_store import atomic_output
+import logging_setup
+from program_prices import load_price_index
+import query_stats
+from records import Enrollment
+import singleflight
+
+# Configure logging: a background writer to a rotating student_funds.log and stderr.
+# Set LOG_LEVEL=DEBUG for the per-student lines (see logging_setup.py).
+logging_setup.configure()
 
 # Get current date
 def get_current_date():
@@ -123,7 +107,7 @@ def get_enrollments(db, limit=None):
         query = query.format(limit_clause=limit_clause)
         cursor.execute(query)
         results = cursor.fetchall()
-        enrollments = [{'student_id': row[0], 'start_date': row[1], 'program': row[2], 'status': row[3]} for row in results]
+        enrollments = [Enrollment(*row) for row in results]
         # Print the total number of students found
         logging.info(f"Number of students found: {len(enrollments)}")
         return enrollments
@@ -133,39 +117,6 @@ def get_enrollments(db, limit=None):
     finally:
         cursor.close()
 
-# Get COACODE as price per credit from programs table
-def get_program_details(db, program_code):
-    cursor = db.cursor(buffered=True)
-    try:
-        query = '''
-        SELECT COACODE
-        FROM `programs`
-        WHERE `PROGRAMCODE` = %s
-        AND `ACTIVE` = 1;
-        '''
-        cursor.execute(query, (program_code,))
-        result = cursor.fetchone()
-        if result and result[0] is not None:
-            coacode_str = str(result[0]).strip()
-            logging.info(f"Fetched COACODE for Program {program_code}: '{coacode_str}'")
-            if coacode_str == '':
-                logging.warning(f"COACODE for Program {program_code} is empty.")
-                return 0.0  # Default value when COACODE is empty
-            try:
-                price_per_credit = float(coacode_str)
-                return price_per_credit
-            except ValueError:
-                logging.error(f"Invalid COACODE format for Program {program_code}: '{coacode_str}'. Setting Price per Credit to 0.0.")
-                return 0.0  # Default value when COACODE is invalid
-        else:
-            logging.warning(f"No active COACODE found for Program {program_code}. Setting Price per Credit to 0.0.")
-            return 0.0  # Default value when COACODE is missing or program is inactive
-    except mysql.connector.Error as e:
-        logging.error(f"Error in get_program_details for Program {program_code}: {e}")
-        return 0.0  # Default value on query error
-    finally:
-        cursor.close()
-
 # Check account ledger for each student and return the tuition amount or "No Tuition"
 def check_account_ledger(db, student_id, term_start_date, term_end_date):
     cursor = db.cursor(buffered=True)
@@ -236,7 +187,17 @@ def get_total_scheduled_funds(db, student_id, enrollment_start_date):
 
 # Main function to run all checks and write to CSV
 def run_check():
-    db = connect_to_db()
+    """Run the check once for all concurrent callers on the same day (see singleflight.py)."""
+    current_date = datetime.now().strftime('%Y-%m-%d')
+    return singleflight.group("susans_check.run_check").do((current_date,), _run_check)
+
+def _run_check():
+    # Every query of the run is timed; the summary is logged and shown in the UI (see query_stats.py)
+    with query_stats.collect("susans_check.run_check"):
+        _check_funds()
+
+def _check_funds():
+    db = query_stats.instrument(connect_to_db())
     if db:
         try:
             # Get current date
@@ -256,15 +217,22 @@ def run_check():
             # For testing purposes, you can set a limit, e.g., get_enrollments(db, limit=10)
 
             # Sort enrollments by student ID
-            enrollments = sorted(enrollments, key=lambda x: x['student_id'])
+            enrollments = sorted(enrollments, key=lambda x: x.student_id)
 
             # Print the count of enrollments
             logging.info(f"Total number of enrollments fetched: {len(enrollments)}")
 
+            # Load every program's price per credit once for the whole run
+            prices = load_price_index(db)
+
             # CSV file setup
             csv_file = "student_funds.csv"
             duplicate_csv_file = "duplicate_student_funds.csv"
-            with open(csv_file, mode='w', newline='') as file:
+            # Written to temp files and swapped in atomically, so readers never see a partial file
+            with atomic_output(csv_file) as csv_temp, \
+                 atomic_output(duplicate_csv_file) as duplicate_temp, \
+                 open(csv_temp, mode='w', newline='') as file, \
+                 open(duplicate_temp, mode='w', newline='') as dup_file:
                 writer = csv.writer(file)
 
                 # Write the header
@@ -286,59 +254,65 @@ def run_check():
                 ]
                 writer.writerow(header)
 
+                # Duplicate rows are written to the duplicate CSV file as they are found
+                duplicate_writer = DuplicateWriter(dup_file, header)
+
                 processed_count = 0
+                no_tuition_count = 0
+                total_remaining_need = 0.0
 
                 # Loop through each student and perform checks
                 for enrollment in enrollments:
-                    student_id = enrollment['student_id']
-                    enrollment_start_date = enrollment['start_date']
-                    program_code = enrollment['program']
-                    status = enrollment['status']  # New Field
+                    student_id = enrollment.student_id
+                    enrollment_start_date = enrollment.start_date
+                    program_code = enrollment.program
+                    status = enrollment.status  # New Field
 
-                    # Print for debugging
-                    logging.info(f"Processing Student ID: {student_id}, Enrollment Start Date: {enrollment_start_date}, Program: {program_code}, Status: {status}")
+                    # Per-student details are DEBUG-only; the run ends with one summary line
+                    logging.debug("Processing Student ID: %s, Enrollment Start Date: %s, Program: %s, Status: %s",
+                                  student_id, enrollment_start_date, program_code, status)
 
                     # Check account ledger for tuition
                     tuition_amount = check_account_ledger(db, student_id, term_start_date, term_end_date)
-                    logging.info(f"Tuition for Student {student_id}: {tuition_amount}")
+                    logging.debug("Tuition for Student %s: %s", student_id, tuition_amount)
 
                     # Check scheduled funds for the current term
                     term_scheduled_funds = get_term_scheduled_funds(db, student_id, term_start_date, term_end_date)
-                    logging.info(f"Term Scheduled Funds for Student {student_id}: {term_scheduled_funds}")
+                    logging.debug("Term Scheduled Funds for Student %s: %s", student_id, term_scheduled_funds)
 
                     # Check total scheduled funds for the entire enrollment
                     total_scheduled_funds = get_total_scheduled_funds(db, student_id, enrollment_start_date)
-                    logging.info(f"Total Scheduled Funds for Student {student_id}: {total_scheduled_funds}")
+                    logging.debug("Total Scheduled Funds for Student %s: %s", student_id, total_scheduled_funds)
 
                     # Fetch total credits for the current term
                     total_credits = get_total_credits(db, student_id, term_start_date, term_end_date)
-                    logging.info(f"Total Credits for Student {student_id}: {total_credits}")
+                    logging.debug("Total Credits for Student %s: %s", student_id, total_credits)
 
                     # Fetch total enrollment credits
                     total_enrollment_credits = get_total_enrollment_credits(db, student_id)
-                    logging.info(f"Total Enrollment Credits for Student {student_id}: {total_enrollment_credits}")
+                    logging.debug("Total Enrollment Credits for Student %s: %s", student_id, total_enrollment_credits)
 
                     # Get program details (COACODE as price per credit)
-                    price_per_credit = get_program_details(db, program_code)
-                    logging.info(f"Program Details for {program_code} - Price per Credit: {price_per_credit}")
+                    price_per_credit = prices.price(program_code)
+                    logging.debug("Program Details for %s - Price per Credit: %s", program_code, price_per_credit)
 
                     # Calculate semester price
                     semester_price = float(total_credits) * price_per_credit if price_per_credit else 0.0
-                    logging.info(f"Semester Price for Student {student_id}: {semester_price}")
+                    logging.debug("Semester Price for Student %s: %s", student_id, semester_price)
 
                     # Calculate overall price
                     overall_price = float(total_enrollment_credits) * price_per_credit if price_per_credit else 0.0
-                    logging.info(f"Overall Price for Student {student_id}: {overall_price}")
+                    logging.debug("Overall Price for Student %s: %s", student_id, overall_price)
 
                     # Calculate remaining need
                     remaining_need = overall_price - total_scheduled_funds
-                    logging.info(f"Remaining Need for Student {student_id}: {remaining_need}")
+                    logging.debug("Remaining Need for Student %s: %s", student_id, remaining_need)
 
                     # Create the link
                     link = f"https://mediatechcloud.com/index.php?name={student_id}"
 
                     # Prepare the row data
-                    row_data = [
+                    row_data = (
                         student_id,
                         program_code,
                         enrollment_start_date,
@@ -353,44 +327,30 @@ def run_check():
                         overall_price,           # New Data Field
                         remaining_need,          # New Data Field
                         link
-                    ]
+                    )
 
                     # Write the student data to the CSV file
                     writer.writerow(row_data)
+                    duplicate_writer.add(row_data)
 
-                    # Update and print progress after every 10 students
+                    # Update the run totals and log progress after every 10 students
                     processed_count += 1
+                    no_tuition_count += tuition_amount == "No Tuition"
+                    total_remaining_need += remaining_need
                     if processed_count % 10 == 0:
-                        logging.info(f"Processed {processed_count} students.")
+                        logging.debug("Processed %d students.", processed_count)
 
+                logging.info("Processed %d students: %d without tuition, total remaining need %.2f.",
+                             processed_count, no_tuition_count, total_remaining_need)
+                prices.log_summary()
                 logging.info(f"CSV file '{csv_file}' created successfully with {processed_count} records.")
-
-            # Read the main CSV file and identify duplicates
-            student_id_counts = defaultdict(list)
-            duplicate_records = []
-            with open(csv_file, mode='r') as file:
-                reader = csv.reader(file)
-                header = next(reader)  # Skip the header
-                for row in reader:
-                    student_id = row[0]
-                    student_id_counts[student_id].append(row)
-                    if len(student_id_counts[student_id]) > 1:
-                        duplicate_records.extend(student_id_counts[student_id])
-
-            # Write all duplicate records to the duplicate CSV file
-            with open(duplicate_csv_file, mode='w', newline='') as dup_file:
-                dup_writer = csv.writer(dup_file)
-                dup_writer.writerow(header)  # Write the header
-                for record in duplicate_records:
-                    dup_writer.writerow(record)
-
-            logging.info(f"Duplicate CSV file '{duplicate_csv_file}' created successfully with {len(duplicate_records)} records.")
+                logging.info(f"Duplicate CSV file '{duplicate_csv_file}' created successfully with {duplicate_writer.count} records.")
 
         except Exception as e:
             logging.error(f"An error occurred: {e}")
         finally:
             db.close()
-            logging.info("Database connection closed.")
+            logging.info("Database connection returned to the pool.")
 
 def main():
     st.title("Student Funds Check")
@@ -403,6 +363,10 @@ def main():
         if st.button("Run Check"):
             run_check()
             st.success("Check completed!")
+            last_run = query_stats.last_run("susans_check.run_check")
+            if last_run is not None:
+                with st.expander(f"Query timings ({last_run.elapsed:.1f}s)"):
+                    st.dataframe(last_run.summary(), use_container_width=True)
 
         # Read the CSV file and display the table
         try:
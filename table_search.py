@@ -0,0 +1,65 @@
+"""
+Search over the funds table for the "Search Table" box.
+
+build_search_index lowercases every column once per dataset and joins each row
+into a single search string. search_mask then filters with one vectorized
+substring match per query term instead of a row-wise DataFrame.apply.
+
+Query syntax: whitespace-separated terms, all of which must match. A term of the
+form column:value (e.g. program:ABC or "last name":smith) only searches that
+column. Quotes keep a phrase together.
+"""
+
+import shlex
+
+import numpy as np
+
+# Joins cells in the row search string; it never appears in a typed query.
+SEPARATOR = "\x1f"
+
+def _normalize_column(name):
+    """Column key used for column:value terms, e.g. "Student ID" -> "studentid"."""
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
+def build_search_index(df):
+    """Precompute lowercase text for every column and a concatenated per-row search column."""
+    columns = {name: df[name].astype(str).str.lower() for name in df.columns}
+    combined = None
+    for text in columns.values():
+        combined = text if combined is None else combined + SEPARATOR + text
+    return {
+        'rows': len(df),
+        'combined': combined,
+        'columns': {_normalize_column(name): text for name, text in columns.items()},
+    }
+
+def parse_query(query):
+    """Split a query into (column key or None, value, whole term) triples, lowercased."""
+    try:
+        tokens = shlex.split(query)
+    except ValueError:
+        # Unbalanced quotes: fall back to plain whitespace splitting.
+        tokens = query.split()
+    terms = []
+    for token in tokens:
+        token = token.lower()
+        column, sep, value = token.partition(":")
+        if sep and column and value:
+            terms.append((_normalize_column(column), value, token))
+        elif token:
+            terms.append((None, token, token))
+    return terms
+
+def search_mask(index, query):
+    """Return a boolean array selecting the rows that match every term in the query."""
+    mask = np.ones(index['rows'], dtype=bool)
+    if index['combined'] is None:
+        return mask
+    for column, value, token in parse_query(query):
+        if column in index['columns']:
+            matches = index['columns'][column].str.contains(value, regex=False)
+        else:
+            # Plain term, or a colon that does not name a column (e.g. a URL): match anywhere in the row.
+            matches = index['combined'].str.contains(token, regex=False)
+        mask &= matches.to_numpy()
+    return mask
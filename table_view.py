@@ -0,0 +1,146 @@
+"""
+Rendering of the funds table for the Streamlit page.
+
+The table can be shown two ways. In paginated mode, sorting, searching and
+slicing happen here on the server, and only the visible page of rows is turned
+into HTML. In full mode, the whole table is shipped and DataTables sorts it in
+the browser.
+
+Rendered HTML is kept in a byte-bounded LRU cache keyed by the result version
+and the view settings, so reruns that do not change the table reuse it.
+"""
+
+import math
+import os
+import threading
+
+import pandas as pd
+from cachetools import LRUCache
+
+TABLE_MODES = ["Paginated", "Full table"]
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+# Upper bound on the total size of cached HTML, in characters.
+RENDER_CACHE_BYTES = int(os.getenv('RENDER_CACHE_BYTES', 64 * 1024 * 1024))
+
+_render_cache = LRUCache(maxsize=RENDER_CACHE_BYTES, getsizeof=len)
+_render_lock = threading.Lock()
+
+def _sort_key(column):
+    """Sort numbers numerically even in mixed columns (e.g. Tuition with "No Tuition")."""
+    if column.dtype == object:
+        numeric = pd.to_numeric(column, errors="coerce")
+        if numeric.notna().any():
+            return numeric
+        return column.astype(str).str.lower()
+    return column
+
+def sort_table(df, sort_by, ascending=True):
+    """Return the table sorted by one column; rows that do not sort (e.g. "No Tuition") go last."""
+    if not sort_by or sort_by not in df.columns:
+        return df
+    return df.sort_values(sort_by, ascending=ascending, kind="stable", key=_sort_key, na_position="last")
+
+def page_count(row_count, page_size):
+    """Return the number of pages needed for row_count rows (at least 1)."""
+    return max(1, math.ceil(row_count / page_size))
+
+def get_page(df, page, page_size):
+    """Return the rows of a 1-based page."""
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+def with_link_column(df):
+    """Return a copy with the 'Link' column converted to clickable HTML links."""
+    df = df.copy()
+    if 'Link' in df.columns:
+        df['Link'] = df['Link'].apply(lambda x: f'<a href="{x}" target="_blank">Click here</a>' if pd.notnull(x) else '')
+    return df
+
+def render_table_html(df, client_sorting=True):
+    """
+    Return the DataTables HTML page for the given rows. Pass client_sorting=False
+    when the rows are already sorted on the server.
+    """
+    html_table = with_link_column(df).to_html(escape=False, index=False, table_id="myTable", classes="display")
+    ordering = "true" if client_sorting else "false"
+
+    return f"""
+    <html>
+      <head>
+        <link rel="stylesheet" type="text/css" href="https://cdn.datatables.net/1.13.4/css/jquery.dataTables.min.css"/>
+        <script src="https://code.jquery.com/jquery-3.5.1.min.js"></script>
+        <script src="https://cdn.datatables.net/1.13.4/js/jquery.dataTables.min.js"></script>
+        <style>
+         #myTable {{
+                width: 100% !important;
+                margin: 0 !important;
+            }}
+            .dataTables_wrapper {{
+                position: relative;
+            }}
+            .dataTables_scrollHead {{
+                position: sticky !important;
+                top: 0;
+                z-index: 1;
+                background: white;
+            }}
+            .dataTables_scrollBody {{
+                position: relative;
+            }}
+            th, td {{
+                white-space: nowrap;
+                padding: 8px !important;
+            }}
+        </style>
+      </head>
+      <body>
+        {html_table}
+       <script>
+          $(document).ready(function() {{
+              var table = $('#myTable').DataTable({{
+                "searching": false,
+                "paging": false,
+                "ordering": {ordering},
+                "scrollY": "550px",
+                "scrollX": true,
+                "autoWidth": true,
+                "scrollCollapse": true,
+                "fixedHeader": true,
+                "columnDefs": [{{
+                    "targets": "_all",
+                    "className": "dt-head-left"  // Align header text left
+                }}]
+              }});
+              
+              // Initial column adjustment
+              table.columns.adjust().draw();
+              
+              // Handle window resize
+              $(window).on('resize', function() {{
+                  table.columns.adjust();
+              }});
+              
+              // Handle container resize (for Streamlit)
+              new ResizeObserver(() => {{
+                  table.columns.adjust();
+              }}).observe(document.querySelector('.dataTables_wrapper'));
+          }});
+        </script>
+      </body>
+    </html>
+    """
+
+def cached_render(key, render):
+    """
+    Return the HTML cached under `key`, calling render() to build it on a miss.
+    The key must include the result version so a new result is never served stale HTML.
+    """
+    with _render_lock:
+        html = _render_cache.get(key)
+    if html is None:
+        html = render()
+        if len(html) <= RENDER_CACHE_BYTES:
+            with _render_lock:
+                _render_cache[key] = html
+    return html